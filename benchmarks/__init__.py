@@ -0,0 +1 @@
+"""Offline benchmarks for the ZeroBypass typing engine."""
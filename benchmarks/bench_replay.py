@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Records a seeded engine run as an event log and replays it at full speed.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_replay --size 1M --seed 1 --save run.zbel
+    python -m benchmarks.bench_replay --log run.zbel --check-seed
+    python -m benchmarks.bench_replay --size 20K --backend cdp --rtt 0.5 --in-flight 1
+
+The same seed and size always produce the same log, so replay numbers are comparable
+between keyboard backends, and ``--check-seed`` re-runs the engine to confirm a
+``Typo``/``Delay`` change still emits the identical event stream. ``--backend cdp``
+replays through ``CDPKeyboard`` over a fake session answering after ``--rtt`` ms, to
+compare pipelined sends with waiting for every reply (``--in-flight 1``).
+"""
+import argparse
+import asyncio
+import time
+
+from .bench_typing import make_text, parse_size
+from .fake_page import FakeCDPSession, FakePage, VirtualClock
+
+
+async def record(size: int, seed: int, use_plan: bool = False) -> bytes:
+    from zerobypass.algorithm import Algorithm, Config
+    from zerobypass.eventlog import EventLog
+
+    log = EventLog(seed=seed)
+    page = FakePage()
+    algo = Algorithm(page, Config(seed=seed, use_plan=use_plan, verify=False), quiet=True, interactive=False, event_log=log)
+    clock = VirtualClock()
+    algo.timer.scheduler.clock, algo.timer.scheduler.sleep = clock.monotonic, clock.sleep
+    text = make_text(size, seed)
+    await algo.type_text(text)
+    if page.keyboard.text() != text:
+        raise AssertionError("recorded run does not reproduce the source text")
+    return log.getvalue()
+
+
+async def replay_once(data: bytes, backend: str = "memory", rtt: float = 0.0, in_flight: int = 64) -> dict:
+    from zerobypass.eventlog import replay
+    from zerobypass.keyboard import CDPKeyboard, MemoryKeyboard
+
+    target = keyboard = MemoryKeyboard()
+    if backend == "cdp":
+        keyboard = CDPKeyboard(FakeCDPSession(target, rtt), in_flight)
+    start = time.perf_counter()
+    cpu = time.process_time()
+    stats = await replay(data, keyboard)
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu
+    return {
+        "events": stats.events,
+        "keyboard_calls": stats.keyboard_calls,
+        "chars": stats.chars,
+        "logged_delay_s": stats.delay,
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "events_per_s": stats.events / wall if wall else 0.0,
+        "typed_chars": len(target.text()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and replay engine event logs.")
+    parser.add_argument("--size", default="100K", help="Input size to record (K/M suffixes allowed).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--plan", action="store_true", help="Record the precomputed TypingPlan executor.")
+    parser.add_argument("--save", help="Write the recorded log to this file.")
+    parser.add_argument("--log", help="Replay this log instead of recording a new one.")
+    parser.add_argument("--backend", choices=("memory", "cdp"), default="memory",
+                        help="Replay into a MemoryKeyboard directly or through CDPKeyboard and a fake session.")
+    parser.add_argument("--rtt", type=float, default=0.0, help="With --backend cdp: reply latency in ms.")
+    parser.add_argument("--in-flight", type=int, default=64,
+                        help="With --backend cdp: max unanswered commands (1 waits for every reply).")
+    parser.add_argument("--check-seed", action="store_true",
+                        help="Re-record with the log's seed and fail if the event stream differs "
+                             "(only for logs recorded by this benchmark, with the same --plan).")
+    opts = parser.parse_args(argv)
+
+    from zerobypass.config import console
+    from zerobypass.eventlog import read_header
+    console.quiet = True
+
+    if opts.log:
+        with open(opts.log, "rb") as f:
+            data = f.read()
+    else:
+        start = time.perf_counter()
+        data = asyncio.run(record(parse_size(opts.size), opts.seed, opts.plan))
+        print(f"recorded {len(data)} bytes in {time.perf_counter() - start:.2f}s")
+        if opts.save:
+            with open(opts.save, "wb") as f:
+                f.write(data)
+
+    result = asyncio.run(replay_once(data, opts.backend, opts.rtt / 1000, opts.in_flight))
+    print(f"{result['events']} events, {result['keyboard_calls']} keyboard calls, "
+          f"{result['logged_delay_s']:.1f}s of logged delay")
+    print(f"replayed in {result['wall_s']:.3f}s ({result['cpu_s']:.3f}s CPU, {result['events_per_s']:.0f} events/s), "
+          f"{len(data) / max(result['typed_chars'], 1):.2f} log bytes per typed char")
+
+    if opts.check_seed:
+        seed, start = read_header(data)
+        if seed is None:
+            parser.error("the log was recorded without a seed")
+        again = asyncio.run(record(result["typed_chars"], seed, opts.plan))
+        if again[read_header(again)[1]:] != data[start:]:  # headers differ between log versions
+            print("event stream differs from the log")
+            raise SystemExit(1)
+        print("event stream is identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Measures how much of a typing job is engine overhead rather than configured delay.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_typing --sizes 1K,100K,1M,10M --save bench.json
+    python -m benchmarks.bench_typing --compare bench.json
+
+No browser is needed: the page is a ``FakePage`` whose keyboard only records calls,
+and sleeps are virtual (or scaled with ``--sleep-scale``).
+"""
+import argparse
+import asyncio
+import functools
+import inspect
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+
+from .fake_page import FakePage, VirtualClock
+
+WORDS = ("the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog", "Research", "testing",
+         "keyboard", "latency", "a", "of", "and", "to", "in", "is", "it", "that")
+PUNCTUATION = (".", ",", ";", ":", "?", "!")
+
+
+def parse_size(value: str) -> int:
+    units = {"K": 1024, "M": 1024 ** 2}
+    value = value.strip().upper()
+    if value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def make_text(size: int, seed: int = 0) -> str:
+    """Deterministic prose-like ASCII text of exactly ``size`` characters."""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < 0.08:
+            word += rng.choice(PUNCTUATION)
+        if roll < 0.01:
+            word += "\n"
+        else:
+            word += " "
+        parts.append(word)
+        length += len(word)
+    return "".join(parts)[:size]
+
+
+class SectionTimer:
+    """Accumulates wall time spent inside wrapped methods.
+
+    Methods are wrapped on the class, before any engine is built, because ``Modules``
+    binds the lifecycle hooks once at registration.
+    """
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self.calls = defaultdict(int)
+
+    def wrap(self, cls, name: str, section: str):
+        func = getattr(cls, name)
+        clock = time.perf_counter
+        totals, calls = self.totals, self.calls
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def timed(*a, **kw):
+                start = clock()
+                try:
+                    return await func(*a, **kw)
+                finally:
+                    totals[section] += clock() - start
+                    calls[section] += 1
+        else:
+            @functools.wraps(func)
+            def timed(*a, **kw):
+                start = clock()
+                try:
+                    return func(*a, **kw)
+                finally:
+                    totals[section] += clock() - start
+                    calls[section] += 1
+
+        setattr(cls, name, timed)
+
+    def clear(self):
+        self.totals.clear()
+        self.calls.clear()
+
+
+def instrument(sections: SectionTimer):
+    from zerobypass.algorithm import Delay, Modules, Typo
+
+    sections.wrap(Modules, "process_lifecycle", "process_lifecycle")
+    sections.wrap(Delay, "get_delay", "get_delay")
+    for hook in ("pre_char", "tick", "on_char", "postprocess"):
+        sections.wrap(Typo, hook, "typo")
+
+
+async def run_once(sections: SectionTimer, size: int, sleep_scale: float, seed: int, use_plan: bool = False,
+                   bulk: bool = False) -> dict:
+    from zerobypass import algorithm
+
+    text = make_text(size, seed)
+
+    page = FakePage()
+    # the fake page's readback isn't representative, so verification is left out
+    config = algorithm.Config(seed=seed, verify=False)
+    if bulk:
+        config = algorithm.Config(bulk_insert=True, enable_typos=False, enable_jitter=False, min_delay=0.0, seed=seed,
+                                  verify=False)
+    algo = algorithm.Algorithm(page, config, quiet=True, interactive=False)  # never read stdin
+    clock = VirtualClock(sleep_scale)
+    scheduler = algo.timer.scheduler
+    scheduler.clock, scheduler.sleep = clock.monotonic, clock.sleep
+
+    sections.clear()
+    start = time.perf_counter()
+    plan = algo.build_plan(text) if use_plan else None
+    sections.totals["plan_build"] = time.perf_counter() - start
+    await algo.type_text(text, plan)
+    wall = time.perf_counter() - start
+
+    if page.keyboard.text() != text:
+        raise AssertionError(f"typed text does not match the source ({size} chars)")
+
+    overhead = wall - clock.slept
+    return {
+        "size": size,
+        "wall_s": wall,
+        "configured_delay_s": scheduler.planned,
+        "slept_s": clock.requested,  # configured delay minus what the scheduler compensated
+        "overhead_s": overhead,
+        "chars_per_s": size / wall if wall else 0.0,
+        "overhead_us_per_char": overhead / size * 1e6,
+        "keyboard_calls": page.keyboard.calls,
+        "sleep_calls": clock.calls,
+        "lost_s": scheduler.lost,
+        "drift_s": scheduler.total_drift,  # lateness at waits, keyboard time the schedule absorbed
+        "sections_us_per_char": {k: v / size * 1e6 for k, v in sections.totals.items()},
+    }
+
+
+def print_report(results):
+    header = (f"{'size':>10} {'chars/s':>12} {'overhead/char':>14} {'lifecycle':>10} {'get_delay':>10} {'typo':>10} "
+              f"{'plan':>10} {'delay':>12}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        s = r["sections_us_per_char"]
+        print(f"{r['size']:>10} {r['chars_per_s']:>12.0f} {r['overhead_us_per_char']:>12.2f}us "
+              f"{s.get('process_lifecycle', 0):>8.2f}us {s.get('get_delay', 0):>8.2f}us {s.get('typo', 0):>8.2f}us "
+              f"{s.get('plan_build', 0):>8.2f}us "
+              f"{r['configured_delay_s']:>11.4g}s")
+    print("\ntypo time is a subset of process_lifecycle, plus end-of-text corrections.")
+
+
+def compare(results, baseline_path: str, tolerance: float) -> bool:
+    with open(baseline_path) as f:
+        baseline = {r["size"]: r for r in json.load(f)["results"]}
+    ok = True
+    for r in results:
+        base = baseline.get(r["size"])
+        if not base:
+            continue
+        ratio = r["overhead_us_per_char"] / base["overhead_us_per_char"]
+        status = "ok"
+        if ratio > 1 + tolerance:
+            status = "REGRESSION"
+            ok = False
+        print(f"{r['size']:>10}: {base['overhead_us_per_char']:.2f}us -> {r['overhead_us_per_char']:.2f}us "
+              f"({ratio:.2f}x) {status}")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark for Algorithm.type_text.")
+    parser.add_argument("--sizes", default="1K,100K,1M,10M",
+                        help="Comma separated input sizes (K/M suffixes allowed).")
+    parser.add_argument("--sleep-scale", type=float, default=0.0,
+                        help="Fraction of each configured delay to really sleep (0 = virtual sleeps).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--plan", action="store_true", help="Benchmark the precomputed TypingPlan executor.")
+    parser.add_argument("--bulk", action="store_true", help="Benchmark the coalesced bulk insert mode.")
+    parser.add_argument("--save", help="Write results as JSON to this file.")
+    parser.add_argument("--compare", help="Compare against a JSON file written by --save.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative increase in overhead per char before --compare fails.")
+    opts = parser.parse_args(argv)
+
+    from zerobypass.config import console
+    console.quiet = True
+
+    sections = SectionTimer()
+    instrument(sections)
+    results = []
+    for size in map(parse_size, opts.sizes.split(",")):
+        results.append(asyncio.run(run_once(sections, size, opts.sleep_scale, opts.seed, opts.plan, opts.bulk)))
+    print_report(results)
+
+    if opts.save:
+        with open(opts.save, "w") as f:
+            json.dump({"python": sys.version, "results": results}, f, indent=2)
+    if opts.compare and not compare(results, opts.compare, opts.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
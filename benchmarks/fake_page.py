@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Browser-free stand-ins used by the benchmarks."""
+import asyncio
+import time
+from array import array
+from typing import List
+
+INSERT = 0
+PRESS = 1
+
+
+class RecordingKeyboard:
+    """Records every keyboard call with a monotonic timestamp.
+
+    Storage is kept compact (arrays instead of tuples) so multi-megabyte runs
+    don't spend their time in the allocator.
+    """
+
+    def __init__(self):
+        self.times = array('d')
+        self.kinds = bytearray()
+        self.payloads: List[str] = []
+
+    async def insert_text(self, text: str):
+        self.times.append(time.monotonic())
+        self.kinds.append(INSERT)
+        self.payloads.append(text)
+
+    async def press(self, key: str):
+        self.times.append(time.monotonic())
+        self.kinds.append(PRESS)
+        self.payloads.append(key)
+
+    @property
+    def calls(self) -> int:
+        return len(self.kinds)
+
+    def text(self) -> str:
+        """Rebuilds what an editor would contain after all recorded calls."""
+        out: List[str] = []
+        for kind, payload in zip(self.kinds, self.payloads):
+            if kind == INSERT:
+                out.append(payload)
+            elif payload == "Enter":
+                out.append("\n")
+            elif payload == "Backspace" and out:
+                # inserts can be longer than one character
+                last = out.pop()
+                if len(last) > 1:
+                    out.append(last[:-1])
+        return "".join(out)
+
+
+class FakePage:
+    def __init__(self):
+        self.keyboard = RecordingKeyboard()
+
+    def is_closed(self) -> bool:
+        return False
+
+    async def evaluate(self, expression: str, arg=None):
+        # the only scripts the engine runs read back the focused element's text
+        return self.keyboard.text()
+
+
+class FakeCDPSession:
+    """A ``CDPSession`` that applies Input commands to a ``MemoryKeyboard`` and answers after rtt seconds.
+
+    Commands are applied when sent, in order, like Chromium handles them; only the reply
+    is delayed, so pipelined and serial backends end up with the same text.
+    """
+
+    def __init__(self, keyboard, rtt: float = 0.0):
+        self.keyboard = keyboard
+        self.rtt = rtt
+        self.sent = 0
+
+    async def send(self, method: str, params: dict):
+        self.sent += 1
+        if method == "Input.insertText":
+            await self.keyboard.insert_text(params["text"])
+        elif params["type"] != "keyUp":
+            await self.keyboard.press(params["key"])
+        await asyncio.sleep(self.rtt)
+        return {}
+
+    async def detach(self):
+        pass
+
+
+class VirtualClock:
+    """Clock and sleep for the engine's ``DeadlineScheduler``.
+
+    With ``scale=0`` sleeps are virtual: the requested time is only accounted for and
+    ``monotonic()`` jumps forward by it. Any other scale really sleeps for ``duration * scale``.
+    """
+
+    def __init__(self, scale: float = 0.0):
+        self.scale = scale
+        self.requested = 0.0  # total sleep requested by the scheduler
+        self.slept = 0.0  # wall time actually spent sleeping
+        self.calls = 0
+
+    async def sleep(self, duration: float):
+        self.calls += 1
+        self.requested += duration
+        if self.scale:
+            start = time.perf_counter()
+            await asyncio.sleep(duration * self.scale)
+            self.slept += time.perf_counter() - start
+
+    def monotonic(self) -> float:
+        return time.monotonic() + self.requested - self.slept
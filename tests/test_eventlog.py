@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from zerobypass.eventlog import (BACKSPACE, DELAY, ENTER, INSERT, MAGIC, PRESS, EventLog, iter_events,
+                                 read_header, replay)
+from zerobypass.keyboard import MemoryKeyboard
+
+
+@pytest.mark.parametrize("seed", [None, 0, 1, -1, -5, 2 ** 31, -(2 ** 63), 2 ** 64 + 3])
+def test_header_round_trip(seed):
+    log = EventLog(seed=seed)
+    log.insert("x")
+    data = log.getvalue()
+    assert read_header(data)[0] == seed
+    assert list(iter_events(data)) == [(INSERT, "x")]
+
+
+def test_reads_version_1_headers():
+    assert read_header(MAGIC + bytes([1, 0]))[0] is None
+    assert read_header(MAGIC + bytes([1, 6]))[0] == 5
+
+
+def test_rejects_other_data():
+    with pytest.raises(ValueError):
+        read_header(b"nope!")
+    with pytest.raises(ValueError):
+        read_header(MAGIC + bytes([99, 0]))
+
+
+def test_events_round_trip_and_replay():
+    log = EventLog(seed=3)
+    log.insert("héllo 😀")
+    log.delay(0.25)
+    log.press("Backspace")
+    log.backspace(2)
+    log.press("Enter")
+    log.press("Control+b")
+    data = log.getvalue()
+    assert list(iter_events(data)) == [(INSERT, "héllo 😀"), (DELAY, 0.25), (BACKSPACE, 3), (ENTER, None),
+                                       (PRESS, "Control+b")]
+    keyboard = MemoryKeyboard()
+    asyncio.run(replay(data, keyboard))
+    assert keyboard.text() == "héll\n"
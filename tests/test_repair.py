@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from zerobypass.repair import _myers, diff_edits, repair_is_safe
+from zerobypass.target import utf16_offsets
+
+
+def apply(current, edits):
+    for start, end, text in reversed(edits):
+        current = current[:start] + text + current[end:]
+    return current
+
+
+def check(current, source, edits):
+    assert apply(current, edits) == source
+    for (_, end, _), (start, _, _) in zip(edits, edits[1:]):
+        assert end <= start  # ascending, not overlapping
+    assert all(start < end or text for start, end, text in edits)
+
+
+@pytest.mark.parametrize("current, source", [
+    ("", ""),
+    ("abc", "abc"),
+    ("", "abc"),
+    ("abc", ""),
+    ("abc", "abxc"),
+    ("abxc", "abc"),
+    ("abc", "axc"),
+    ("hello world", "helo wrld"),
+    ("aaaa", "aaaaa"),
+    ("abab", "baba"),
+    ("line one\nline two", "line one\n\nline two"),
+    ("😀a😀", "😀😀"),
+])
+def test_diff_edits(current, source):
+    edits = diff_edits(current, source)
+    check(current, source, edits)
+    assert (not edits) == (current == source)
+
+
+def size(edits):
+    return sum(end - start + len(text) for start, end, text in edits)
+
+
+def test_diff_edits_are_minimal():
+    assert diff_edits("abcdef", "abdef") == [(2, 3, "")]
+    assert diff_edits("abdef", "abcdef") == [(2, 2, "c")]
+    assert size(diff_edits("the quick fox", "the quikc fox")) == 2
+    assert size(diff_edits("kitten", "sitting")) == 5
+
+
+def test_diff_edits_falls_back_to_one_replacement():
+    edits = diff_edits("a" * 50 + "xyz" + "b" * 50, "a" * 50 + "uvw" + "b" * 50, max_edits=2)
+    assert edits == [(50, 53, "uvw")]
+
+
+def test_myers_gives_up_past_max_d():
+    assert _myers("abc", "xyz", 5) is None
+    assert _myers("abc", "xyz", 6) is not None
+
+
+def indel_distance(a, b):
+    lcs = [0] * (len(b) + 1)
+    for x in a:
+        prev = 0
+        for j, y in enumerate(b):
+            prev, lcs[j + 1] = lcs[j + 1], prev + 1 if x == y else max(lcs[j + 1], lcs[j])
+    return len(a) + len(b) - 2 * lcs[-1]
+
+
+def test_diff_edits_fuzz():
+    rng = random.Random(0)
+    for _ in range(2000):
+        source = "".join(rng.choice("ab c\n") for _ in range(rng.randint(0, 60)))
+        current = list(source)
+        for _ in range(rng.randint(0, 6)):
+            i = rng.randint(0, len(current))
+            if current and rng.random() < 0.5:
+                del current[min(i, len(current) - 1)]
+            else:
+                current.insert(i, rng.choice("abx\n"))
+        current = "".join(current)
+        edits = diff_edits(current, source)
+        check(current, source, edits)
+        assert size(edits) == indel_distance(current, source)
+
+
+def test_utf16_offsets():
+    assert utf16_offsets("abc", [0, 1, 3]) == [0, 1, 3]
+    assert utf16_offsets("a😀b😀c", [0, 1, 2, 3, 4, 5]) == [0, 1, 3, 4, 6, 7]
+    assert utf16_offsets("😀", [1, 1]) == [2, 2]
+
+
+def test_repair_is_safe():
+    source = "hello world " * 20
+    assert repair_is_safe(source[:-2], source, diff_edits(source[:-2], source))
+    assert not repair_is_safe("", source, diff_edits("", source))
+    assert not repair_is_safe("unrelated", source, diff_edits("unrelated", source))
+    half = source[:len(source) // 2]
+    assert not repair_is_safe(half, source, diff_edits(half, source))
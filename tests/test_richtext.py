@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from zerobypass.richtext import FORMAT, MAX_RUN, TEXT, FormatCommand, RichTextSource, compile_html
+
+
+def text_of(html):
+    return "".join(value for op, value in compile_html(html) if op == TEXT)
+
+
+@pytest.mark.parametrize("html, text", [
+    ("plain", "plain"),
+    ("  a \n\t b  ", "a b"),
+    ("a<span> </span>b", "a b"),
+    ("a&nbsp;&nbsp;b", "a  b"),
+    ("a<br>b", "a\nb"),
+    ("a<br><br>b", "a\n\nb"),
+    ("<p>a</p><p>b</p>", "a\nb"),
+    ("<div><p>a</p></div>\n<div>b</div>", "a\nb"),
+    ("<ul><li>a</li><li>b</li></ul>", "a\nb"),
+    ("<p>a</p><hr><p>b</p>", "a\nb"),
+    ("<pre>a\n  b</pre>", "a\n  b"),
+    ("<p>a<br></p><p>b</p>", "a\nb"),
+    ("<head><title>t</title><style>p {}</style></head><script>x()</script>body", "body"),
+    ("<p>  </p><p>a</p>", "a"),
+])
+def test_text(html, text):
+    assert text_of(html) == text
+
+
+def test_tags_toggle_formatting():
+    assert compile_html("a <b>b</b>c") == [(TEXT, "a "), (FORMAT, "bold"), (TEXT, "b"), (FORMAT, "bold"),
+                                           (TEXT, "c")]
+    assert compile_html("<i>a</i>") == [(FORMAT, "italic"), (TEXT, "a"), (FORMAT, "italic")]
+    assert compile_html("<b><i>a</i></b>") == [(FORMAT, "bold"), (FORMAT, "italic"), (TEXT, "a"),
+                                               (FORMAT, "bold"), (FORMAT, "italic")]
+
+
+def test_inline_styles_toggle_formatting():
+    ops = compile_html('<span style="font-weight: 700; text-decoration: underline">a</span>'
+                       '<b><span style="font-weight:normal">b</span></b>'
+                       '<span style="font-style:italic">c</span>')
+    assert ops == [(FORMAT, "bold"), (FORMAT, "underline"), (TEXT, "a"), (FORMAT, "bold"), (FORMAT, "underline"),
+                   (TEXT, "b"), (FORMAT, "italic"), (TEXT, "c"), (FORMAT, "italic")]
+
+
+def test_redundant_formatting_costs_nothing():
+    assert compile_html("<b></b>a<b>b</b><b>c</b>") == [(TEXT, "a"), (FORMAT, "bold"), (TEXT, "bc"),
+                                                        (FORMAT, "bold")]
+
+
+def test_spaces_keep_the_formatting_before_them():
+    assert compile_html("<b>a </b>b") == [(FORMAT, "bold"), (TEXT, "a "), (FORMAT, "bold"), (TEXT, "b")]
+    assert compile_html("<b>a</b> <i>b</i>") == [(FORMAT, "bold"), (TEXT, "a "), (FORMAT, "bold"),
+                                                 (FORMAT, "italic"), (TEXT, "b"), (FORMAT, "italic")]
+    assert compile_html("<p><b>a</b></p>b") == [(FORMAT, "bold"), (TEXT, "a\n"), (FORMAT, "bold"), (TEXT, "b")]
+
+
+def chunks(html, **kwargs):
+    async def collect():
+        return [chunk async for chunk in RichTextSource(html, **kwargs).chunks()]
+    return asyncio.run(collect())
+
+
+def test_source_splits_text_only_at_formatting():
+    html = "<p>" + "word " * 1000 + "<b>bold</b> tail</p>"
+    items = chunks(html, slice_size=64)
+    kinds = [type(chunk).__name__ for _, _, chunk in items]
+    assert kinds == ["str", "str", "FormatCommand", "str", "FormatCommand", "str"]
+    assert len(items[0][2]) == MAX_RUN
+    assert "".join(chunk for _, _, chunk in items if isinstance(chunk, str)) == text_of(html)
+    assert items[2][2] == FormatCommand("bold", items[2][2].key)
+    offsets = [offset for item in items for offset in item[:2]]
+    assert offsets == sorted(offsets) and offsets[-1] == len(html)
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from zerobypass.scheduler import DeadlineScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, duration):
+        self.slept.append(duration)
+        self.now += duration
+
+
+def run_waits(scheduler, clock, delays, work=0.0):
+    """Waits for every delay, spending work seconds (keyboard calls) before each."""
+    async def run():
+        for delay in delays:
+            clock.now += work
+            await scheduler.wait(delay)
+    asyncio.run(run())
+
+
+def scheduler_for(clock, **kwargs):
+    return DeadlineScheduler(clock=clock.monotonic, sleep=clock.sleep, **kwargs)
+
+
+def test_on_time_waits_have_no_drift():
+    clock = FakeClock()
+    scheduler = scheduler_for(clock)
+    run_waits(scheduler, clock, [0.1] * 5)
+    assert scheduler.drift == 0.0
+    assert scheduler.total_drift == 0.0
+    assert scheduler.planned == pytest.approx(0.5)
+    assert clock.now == pytest.approx(0.5)
+
+
+def test_late_waits_report_and_absorb_drift():
+    clock = FakeClock()
+    scheduler = scheduler_for(clock)
+    run_waits(scheduler, clock, [0.1] * 5, work=0.05)
+    # the first wait anchors the schedule, every later one starts 50 ms after its deadline
+    assert scheduler.drift == pytest.approx(0.05)
+    assert scheduler.total_drift == pytest.approx(0.2)
+    assert clock.slept[1:] == pytest.approx([0.05] * 4)
+    assert clock.now == pytest.approx(0.55)  # only the first wait's work is not made up
+    assert scheduler.lost == 0.0
+
+
+def test_stall_past_max_catchup_is_lost():
+    clock = FakeClock()
+    scheduler = scheduler_for(clock, max_catchup=1.0)
+    run_waits(scheduler, clock, [0.1])
+    clock.now += 3.0
+    run_waits(scheduler, clock, [0.1])
+    assert scheduler.drift == pytest.approx(3.0)
+    assert scheduler.lost == pytest.approx(1.9)
+    assert clock.slept[-1] == pytest.approx(0.025)  # min_sleep_ratio of the delay
+
+
+def test_reset_doesnt_count_the_pause_as_drift():
+    clock = FakeClock()
+    scheduler = scheduler_for(clock)
+    run_waits(scheduler, clock, [0.1] * 2)
+    clock.now += 10.0
+    scheduler.reset()
+    run_waits(scheduler, clock, [0.1] * 2)
+    assert scheduler.total_drift == 0.0
+
+
+def test_uncompensated_waits_still_report_drift():
+    clock = FakeClock()
+    scheduler = scheduler_for(clock, compensate=False)
+    run_waits(scheduler, clock, [0.1] * 3, work=0.02)
+    assert clock.slept == pytest.approx([0.1] * 3)
+    assert scheduler.drift == pytest.approx(0.02)
+    assert scheduler.total_drift == pytest.approx(0.04)
@@ -1,54 +1,229 @@
 #!/usr/bin/env python3
 import asyncio
-# Suppress Warning
+import importlib
+import logging
+import time
 import warnings
+from dataclasses import replace
 
-warnings.filterwarnings("ignore", category=UserWarning, module='stopit')
-# ------------------------------------------------
-from .helpers import wait_till_exit
-from .algorithm import Algorithm
-from .helpers import can_output_graphics, get_text, handle_disclaimer, wait_for_navigate
-from .playwrighter import Playwrighter
+from .config import console, parse_args
 
 # ------------------------------------------------
-global pw
-
-
-async def async_main(ctx):
-    start = False
-    while True:
-        try:
-            captured_text, _ = await get_text()
-            if not start:
-                await pw.start()
-                start = True
-            await wait_for_navigate()
-            current_page = await ctx.get_current_page()
-            algo = Algorithm(current_page)
-            await algo.type_text(captured_text)
+# Heavy modules are imported when first needed so --help and the first prompt stay fast.
+# These are the ones --profile-startup measures, in the order the app loads them.
+STARTUP_MODULES = ("Xlib.display", "rich.markdown", "klembord", "playwright.async_api",
+                   "zerobypass.helpers", "zerobypass.algorithm", "zerobypass.playwrighter")
+
+
+def profile_startup(started: float):
+    from rich.table import Table
+
+    table = Table(title="Startup imports", caption="Times are incremental, shared dependencies count once.")
+    table.add_column("Module")
+    table.add_column("Import time", justify="right")
+    total = 0.0
+    for name in STARTUP_MODULES:
+        before = time.perf_counter()
+        importlib.import_module(name)
+        elapsed = time.perf_counter() - before
+        total += elapsed
+        table.add_row(name, f"{elapsed * 1000:.1f} ms")
+    table.add_row("[bold]total[/bold]", f"[bold]{total * 1000:.1f} ms[/bold]")
+    console.print(table)
+    console.print(f"[dim]{(time.perf_counter() - started) * 1000:.1f} ms since main() started.[/dim]")
+
+
+def build_config(args):
+    from .algorithm import Config
+
+    config = Config(use_plan=args.plan, seed=args.seed, verify=args.verify, layout=args.layout)
+    if args.bulk:
+        config = replace(config, bulk_insert=True, enable_typos=False, enable_jitter=False, min_delay=0.0)
+    return config
+
+
+def target_seconds(args, chars: int):
+    """The requested typing time for chars characters, or None without --target-*."""
+    from .estimate import parse_duration
+
+    if args.target_duration:
+        return parse_duration(args.target_duration)
+    if args.target_cpm:
+        return chars / args.target_cpm * 60
+    return None
+
+
+async def solve_for_target(args, config, text=None, source=None):
+    """Scales config to the --target-* option. Returns (config, predicted seconds or None)."""
+    from .estimate import class_counts, format_duration, solve_config
+
+    if not (args.target_duration or args.target_cpm):
+        return config, None
+    if text is not None:
+        counts = class_counts(text)
+    elif source.is_stdin:
+        console.print("[yellow]--target-* needs the whole text up front, ignored for stdin.[/yellow]")
+        return config, None
+    else:
+        counts = [0, 0, 0]
+        async for _, _, chunk in source.chunks():
+            if isinstance(chunk, str):  # richtext.FormatCommands aren't typed chars
+                counts = [a + b for a, b in zip(counts, class_counts(chunk))]
+    chars = counts[0]
+    if not chars:
+        return config, None
+    try:
+        solved, estimate = solve_config(config, target_seconds(args, chars), *counts)
+    except ValueError as e:
+        console.print(f"[yellow]{e}, typing at the default speed.[/yellow]")
+        return config, None
+    factor = solved.min_delay / config.min_delay if config.min_delay else 1.0
+    console.print(f"[dim]Delays scaled ×{factor:.2f}: ~{format_duration(estimate.total)} to type, "
+                  f"~{chars / estimate.total * 60:,.0f} chars/min.[/dim]")
+    return solved, estimate.total
+
+
+def report_throughput(chars: int, predicted: float, elapsed: float):
+    if elapsed <= 0 or predicted <= 0:
+        return
+    achieved, expected = chars / elapsed * 60, chars / predicted * 60
+    console.print(f"[dim]Throughput: {achieved:,.0f} chars/min achieved, {expected:,.0f} predicted "
+                  f"({(achieved / expected - 1) * 100:+.1f}%).[/dim]")
+
+
+async def type_job(pw, args, config, text=None, source=None, channel=None, ui_loop=None):
+    """Types one job into the current page. Runs on the engine loop; returns (algo, seconds spent typing)."""
+    from .algorithm import Algorithm
+    from .eventlog import EventLog
+    from .keyboard import open_keyboard
+    from .trace import Tracer
+
+    current_page = await pw.get_current_page()
+    tracer = Tracer() if args.trace else None
+    events = EventLog(open(args.record, "wb"), args.seed) if args.record else None
+    keyboard = await open_keyboard(pw.browser, current_page, args.keyboard)
+    algo = Algorithm(current_page, config, quiet=args.quiet, tracer=tracer, event_log=events, tracker=pw.tracker,
+                     keyboard=keyboard, channel=channel, ui_loop=ui_loop)
+    started = time.monotonic()
+    try:
+        if source is not None:
+            await algo.type_stream(source)
+        else:
+            await algo.type_text(text)
+    finally:
+        await keyboard.close()
+        if events:
+            events.close()
+    return algo, time.monotonic() - started - algo.paused_seconds
+
+
+async def async_main(pw, args):
+    from .control import get_channel
+    from .engine import ChannelBridge, EngineStopped, EngineThread, TrackerProxy
+    from .helpers import get_text, wait_for_navigate, wait_till_exit
+
+    # the browser and the typing engine get their own loop, prompts and rendering stay on this one
+    engine = EngineThread()
+    engine.start()
+    ui_loop = asyncio.get_running_loop()
+    channel = ChannelBridge(get_channel(), ui_loop)
+    # launch the browser in the background while the user copies their text
+    start_task = asyncio.create_task(engine.run(pw.start(quiet=True)))
+    try:
+        while True:
+            source = captured_text = None
+            if args.input:
+                from .source import TextSource
+                source = TextSource(args.input)
+            else:
+                captured_text, html = await get_text(build_config(args))
+                if args.rich and html:
+                    from .richtext import RichTextSource
+                    source = RichTextSource(html)
+                elif args.rich:
+                    console.print("[yellow]The capture has no HTML, typing it as plain text.[/yellow]")
+            if start_task.done():
+                await start_task  # surfaces launch errors
+            else:
+                with console.status("[bold blue]Waiting for the browser to finish launching...", spinner="earth"):
+                    await start_task
+            await wait_for_navigate(TrackerProxy(pw.tracker, engine) if pw.tracker else None)
+            config, predicted = await solve_for_target(args, build_config(args), captured_text, source)
+            algo, elapsed = await engine.run(type_job(pw, args, config, captured_text, source, channel, ui_loop))
+            if predicted:
+                report_throughput(algo.mod.typed_count, predicted, elapsed)
+            if algo.mod.tracer:
+                console.print(f"[dim]Trace written to {algo.mod.tracer.write(args.trace)}[/dim]")
             await wait_till_exit()
+            if source is not None and source.is_stdin:
+                break  # stdin is used up, there is no next job
+    except EngineStopped:
+        pass  # the browser failed to launch, Playwrighter.start already said why
+    finally:
+        # TODO: Better error logging
+        if engine.running:
+            await engine.run(pw.close())
+        engine.stop()
+
 
+async def daemon_main(pw, args):
+    from .daemon import Daemon
 
-        except asyncio.CancelledError:
-            if ctx:
-                await ctx.close()
-            raise
-        except Exception as e:
-            # TODO: Better error logging
-            if ctx:
-                await ctx.close()
-            raise e
+    await pw.start()
+    try:
+        await Daemon(pw, args.socket, args.concurrency, build_config(args), args.trace,
+                     args.keyboard).serve_forever()
+    finally:
+        await pw.close()
+
+
+async def submit_main(args):
+    import sys
+
+    from .daemon import default_socket_path, submit
 
+    if args.submit == "-":
+        text = sys.stdin.read()
+    else:
+        with open(args.submit, encoding="utf-8") as f:
+            text = f.read()
+    async for event in submit(args.socket or default_socket_path(), text, args.url, args.selector):
+        if event["event"] == "progress":
+            console.print(f"[dim]{event['typed']}/{event['total']}[/dim]")
+        elif event["event"] == "error":
+            console.print(f"[red]Error: {event['message']}[/red]")
+        else:
+            console.print(f"[bold]{event['event']}[/bold]")
 
-def main():
-    global pw
+
+def main(argv=None):
+    started = time.perf_counter()
+    args = parse_args(argv)
+    # Suppress Warning
+    warnings.filterwarnings("ignore", category=UserWarning, module='stopit')
+    logging.getLogger("playwright").setLevel(logging.ERROR)  # TODO: verify if this actually does anything
     try:
-        can_output_graphics()
-        handle_disclaimer()
+        if args.profile_startup:
+            profile_startup(started)
+        if args.submit:
+            asyncio.run(submit_main(args))
+            return
+
+        from .helpers import can_output_graphics, handle_disclaimer
+
+        terminal = None
+        if args.input == "-":
+            # stdin carries the text, prompts have to come from the terminal
+            from .control import use_terminal
+            terminal = use_terminal()
+        can_output_graphics(terminal)
+        handle_disclaimer(terminal)
+
+        from .playwrighter import Playwrighter
 
-        # TODO implement: implement rich text
-        pw = Playwrighter()
-        asyncio.run(async_main(pw))
+        blocked = [t.strip() for t in args.block_resources.split(",") if t.strip()] if args.block_resources else ()
+        pw = Playwrighter(args.browser_data_dir, args.lean, blocked, args.memory_interval)
+        asyncio.run(daemon_main(pw, args) if args.daemon else async_main(pw, args))
     except KeyboardInterrupt:
         pass
 
@@ -1,14 +1,18 @@
 #!/usr/bin/env python3
 import asyncio
+import bisect
+import itertools
+import math
 import random
-import string
+import time
 from dataclasses import dataclass
 from typing import Optional, List, Tuple
 
-from rich.prompt import Prompt
-
 from .config import console
-from .helpers import listen_for_pause, wait_for_navigate
+from .control import PAUSE, RESTART, RESUME, get_channel, parse_command
+from .helpers import wait_for_navigate
+from .layout import load_layout
+from .scheduler import DeadlineScheduler
 
 
 # --- Configuration ---
@@ -20,114 +24,193 @@ class Config:
     punctuation_pause: Tuple[float, float] = (0.25, 0.65)
     backtrack_chance: float = 0.015
     steps_till_backtrack: Tuple[int, int] = (2, 10)
+    layout: str = "qwerty"  # keyboard layout typos are picked from, a name in layouts/ or a JSON file
     fatigue_scale = 1.01  # 1% slowdown every interval
     fatigue_interval = 50
+    max_fatigue: float = 3.0  # fatigue stops growing at 3x the base delay
+    seed: Optional[int] = None  # seeds every random draw of a run, so it can be reproduced
     # feature config
     enable_typos: bool = True
     enable_jitter: bool = True
     enable_fatigue: bool = True
+    use_plan: bool = False  # precompute every delay and typo before typing (see plan.py)
+    # sleep until absolute deadlines so keyboard latency doesn't add to the delays (see scheduler.py)
+    deadline_scheduling: bool = True
+    max_catchup: float = 1.0  # seconds of lateness the scheduler will try to win back
+    min_sleep_ratio: float = 0.25  # catching up never shortens a delay below this fraction
+    # throughput mode: one insert_text per run of up to max_chunk_size chars, no typos
+    bulk_insert: bool = False
+    max_chunk_size: int = 4096
+    # read the target back after typing and fix small differences from the source (see repair.py)
+    verify: bool = False
+
+
+# lifecycle phases a registered module can hook into, in the order they run
+HOOK_PHASES = ("pre_char", "tick", "on_char", "postprocess")
 
 
 class Modules:
-    def __init__(self, config: Optional[Config] = None):
+    """Hub shared by the lifecycle modules.
+
+    Hooks are collected into per-phase lists when a module is registered, so the
+    per-character lifecycle only calls bound methods. Modules copy the Config values
+    they need when they are created; changing the Config afterwards has no effect.
+    """
+    __slots__ = ("config", "timer", "typos", "registry", "typed_count", "tracer", "rng", "events",
+                 "_pre_char", "_tick", "_on_char", "_postprocess")
+
+    def __init__(self, config: Optional[Config] = None, tracer=None, events=None):
         self.config = config or Config()
+        self.tracer = tracer  # optional trace.Tracer, None keeps the hot path untimed
+        self.events = events  # optional eventlog.EventLog, records requested delays
+        self.rng = random.Random(self.config.seed)  # modules draw from this, never from the random module
+        self.typed_count: int = 0
+        self.registry = []
+        self._pre_char, self._tick, self._on_char, self._postprocess = [], [], [], []
         self.timer = Delay(self)
         self.typos = Typo(self)
         # Register modules that need to hook into the typing lifecycle
-        self.registry = [self.typos]
-        self.typed_count: int = 0
-
-    def __getattr__(self, name):
-        return getattr(self.config, name)
+        self.register(self.typos)
+
+    def register(self, module, phases=HOOK_PHASES):
+        """Hooks a module into the typing lifecycle.
+
+        Any method of the module named after a phase in HOOK_PHASES is called in that phase:
+        ``async pre_char(keyboard)``, ``tick(char)``, ``on_char(char, index) -> str`` and
+        ``async postprocess(keyboard)``. Pass phases to hook only some of them.
+        """
+        for phase in phases:
+            if phase not in HOOK_PHASES:
+                raise ValueError(f"Unknown lifecycle phase: {phase}")
+            hook = getattr(module, phase, None)
+            if hook is not None:
+                getattr(self, "_" + phase).append(hook)
+        self.registry.append(module)
 
     async def process_lifecycle(self, keyboard, char: str, index: int) -> str:
         # handling pre-type logic
-        for mod in self.registry:
-            if hasattr(mod, 'pre_char'):
-                await mod.pre_char(keyboard)
-            if hasattr(mod, 'tick'):
-                mod.tick(char)
+        for hook in self._pre_char:
+            await hook(keyboard)
+        for hook in self._tick:
+            hook(char)
 
         # handling char transformations
-        final_char = char
-        for mod in self.registry:
-            if hasattr(mod, 'on_char'):
-                final_char = mod.on_char(final_char, index)
-
-        return final_char
+        for hook in self._on_char:
+            char = hook(char, index)
+        return char
 
     async def post_lifecycle(self, keyboard) -> None:
-        for mod in self.registry:
-            if hasattr(mod, 'postprocess'):
-                await mod.postprocess(keyboard)
+        for hook in self._postprocess:
+            await hook(keyboard)
 
     async def send_char(self, keyboard, char: str, delay=None):
+        tracer = self.tracer
+        if tracer is not None:
+            start = tracer.now()
         if char == "\n":
             await keyboard.press("Enter")
         else:
             await keyboard.insert_text(char)
+        if tracer is not None:
+            tracer.span("keyboard", start)
 
         if delay is not None:
             await self.timer.sleep(delay)
 
 
+PAUSE_CHARS = frozenset(".?!,;:\n")
+
+
+def fatigue_multiplier(level: int, scale: float, cap: float) -> float:
+    # capping the level keeps scale ** level from overflowing on very long texts
+    if scale > 1 and level > math.log(cap) / math.log(scale):
+        return cap
+    return scale ** level
+
+
 # --- Delay Logic  ---
 class Delay:
     """math"""
+    __slots__ = ("mod", "rng", "scheduler", "min_delay", "max_delay", "punctuation_pause", "enable_jitter",
+                 "enable_fatigue", "fatigue_interval", "fatigue_scale", "max_fatigue")
 
     def __init__(self, mod: Modules):
         self.mod = mod
-
-    def __getattr__(self, name):
-        return getattr(self.mod.config, name)
+        self.rng = mod.rng
+        config = mod.config
+        self.min_delay = config.min_delay
+        self.max_delay = config.max_delay
+        self.punctuation_pause = config.punctuation_pause
+        self.enable_jitter = config.enable_jitter
+        self.enable_fatigue = config.enable_fatigue
+        self.fatigue_interval = config.fatigue_interval
+        self.fatigue_scale = config.fatigue_scale
+        self.max_fatigue = config.max_fatigue
+        self.scheduler = DeadlineScheduler(config.max_catchup, config.min_sleep_ratio,
+                                           compensate=config.deadline_scheduling)
 
     def get_delay(self, char: str) -> float:
         multiplier = self.get_fatigue_multiplier()
         if not self.enable_jitter:
             return self.min_delay * multiplier
 
-        delay = random.uniform(self.min_delay, self.max_delay)
+        delay = self.rng.uniform(self.min_delay, self.max_delay)
 
         # Longer pauses for punctuation
-        if char in {".", "?", "!", ",", ";", ":"}:
-            delay += random.uniform(*self.punctuation_pause)
-        elif char == "\n":
-            delay += random.uniform(*self.punctuation_pause)
+        if char in PAUSE_CHARS:
+            delay += self.rng.uniform(*self.punctuation_pause)
         elif char == " ":
-            delay += random.uniform(0, 0.08)
+            delay += self.rng.uniform(0, 0.08)
         return delay * multiplier
 
+    def get_run_delay(self, count: int) -> float:
+        """Average delay for count chars typed in one go (bulk mode)."""
+        per_char = (self.min_delay + self.max_delay) / 2 if self.enable_jitter else self.min_delay
+        return count * per_char * self.get_fatigue_multiplier()
+
     def get_short_pause(self) -> float:
-        return random.uniform(self.min_delay * 0.5, self.max_delay * 1.5)
+        return self.rng.uniform(self.min_delay * 0.5, self.max_delay * 1.5)
 
     def get_fatigue_multiplier(self) -> float:
-        if not self.mod.config.enable_fatigue:
+        if not self.enable_fatigue:
             return 1.0
         # For every 50 chars, increase delay by 1%
         level = self.mod.typed_count // self.fatigue_interval
-        return self.fatigue_scale ** level
+        return fatigue_multiplier(level, self.fatigue_scale, self.max_fatigue)
 
-    @staticmethod
-    async def sleep(duration: float):
-        await asyncio.sleep(duration)
+    async def sleep(self, duration: float):
+        if self.mod.events is not None:
+            self.mod.events.delay(duration)
+        tracer = self.mod.tracer
+        if tracer is None:
+            await self.scheduler.wait(duration)
+            return
+        start = tracer.now()
+        await self.scheduler.wait(duration)
+        tracer.span("sleep", start)
+        tracer.observe("sleep_overshoot", tracer.now() - start - self.scheduler.last_sleep)
 
 
 # --- Module 3: Typo Logic (The "Brain" of errors) ---
 class Typo:
     """typos"""
+    __slots__ = ("mod", "rng", "timer", "layout", "enable_typos", "backtrack_chance", "steps_till_backtrack",
+                 "pending_correction", "steps_remaining", "backtrack_amount", "backlog")
 
     def __init__(self, mod: Modules):
         self.mod = mod
+        self.rng = mod.rng
+        self.timer = mod.timer
+        self.layout = load_layout(mod.config.layout)
+        self.enable_typos = mod.config.enable_typos
+        self.backtrack_chance = mod.config.backtrack_chance
+        self.steps_till_backtrack = mod.config.steps_till_backtrack
         # State tracking
         self.pending_correction: Optional[str] = None
         self.steps_remaining: int = 0
         self.backtrack_amount: int = 0
         self.backlog: List[str] = []
 
-    def __getattr__(self, name):
-        """Map missing attributes to the hub/config."""
-        return getattr(self.mod, name)
-
     @property
     def is_correction_pending(self) -> bool:
         return self.pending_correction is not None
@@ -140,25 +223,17 @@ class Typo:
         if index < 3 or char.isspace():
             return False
 
-        return random.random() < self.backtrack_chance
+        return self.rng.random() < self.backtrack_chance
 
     def generate_typo_char(self, char: str, register=True) -> str:
         if register:
             self.register_typo(char)
-
-        low_char = char.lower()
-        if low_char in self.QWERTY:
-            neighbors = self.QWERTY[low_char]
-            pool = [n.upper() if char.isupper() else n for n in neighbors]
-            return random.choice(pool)
-        else:
-            pool = [c for c in string.ascii_lowercase if c != low_char]
-            typo = random.choice(pool)
-            return typo.upper() if char.isupper() else typo
+        # a plausible wrong key for char, keeping its case
+        return self.rng.choice(self.layout.neighbors(char))
 
     def register_typo(self, correct_char: str):
         """Sets up the state machine to correct this typo later."""
-        steps = random.randint(*self.steps_till_backtrack)
+        steps = self.rng.randint(*self.steps_till_backtrack)
 
         self.pending_correction = correct_char
         self.steps_remaining = steps
@@ -166,17 +241,23 @@ class Typo:
         self.backlog = []
 
     async def perform_correction(self, keyboard):
+        tracer = self.mod.tracer
+        if tracer is not None:
+            start = tracer.now()
         short_pause = self.timer.get_short_pause()
-        for _ in range(self.backtrack_amount):
+        # at the end of the text fewer chars than planned may follow the typo
+        for _ in range(min(self.backtrack_amount, len(self.backlog) + 1)):
             await keyboard.press("Backspace")
             await self.timer.sleep(short_pause * 2.5)
 
-        await self.send_char(keyboard, self.pending_correction, short_pause)
+        await self.mod.send_char(keyboard, self.pending_correction, short_pause)
 
         for buffered_char in self.backlog:
             delay = self.timer.get_delay(buffered_char)
-            await self.send_char(keyboard, buffered_char, delay)
+            await self.mod.send_char(keyboard, buffered_char, delay)
         self.reset()
+        if tracer is not None:
+            tracer.span("correction", start)
 
     def tick(self, char: str):
         """Decrements the counter until correction."""
@@ -205,122 +286,358 @@ class Typo:
         if self.is_correction_pending:
             await self.perform_correction(keyboard)
 
-    QWERTY = {
-        # Number Row
-        '`': ['1', 'q'], '1': ['`', '2', 'q', 'w'], '2': ['1', '3', 'q', 'w', 'e'],
-        '3': ['2', '4', 'w', 'e', 'r'], '4': ['3', '5', 'e', 'r', 't'],
-        '5': ['4', '6', 'r', 't', 'y'], '6': ['5', '7', 't', 'y', 'u'],
-        '7': ['6', '8', 'y', 'u', 'i'], '8': ['7', '9', 'u', 'i', 'o'],
-        '9': ['8', '0', 'i', 'o', 'p'], '0': ['9', '-', 'o', 'p', '['],
-        '-': ['0', '=', 'p', '[', ']'], '=': ['-', '[', ']'],
-        # Top Row
-        'q': ['`', '1', '2', 'w', 'a', 's'], 'w': ['1', '2', '3', 'q', 'e', 'a', 's', 'd'],
-        'e': ['2', '3', '4', 'w', 'r', 's', 'd', 'f'], 'r': ['3', '4', '5', 'e', 't', 'd', 'f', 'g'],
-        't': ['4', '5', '6', 'r', 'y', 'f', 'g', 'h'], 'y': ['5', '6', '7', 't', 'u', 'g', 'h', 'j'],
-        'u': ['6', '7', '8', 'y', 'i', 'h', 'j', 'k'], 'i': ['7', '8', '9', 'u', 'o', 'j', 'k', 'l'],
-        'o': ['8', '9', '0', 'i', 'p', 'k', 'l', ';'], 'p': ['9', '0', '-', 'o', '[', 'l', ';', "'"],
-        '[': ['0', '-', '=', 'p', ']', ';', "'"], ']': ['-', '=', '[', '\\', "'"], '\\': [']'],
-        # Home Row
-        'a': ['q', 'w', 's', 'z', 'x'], 's': ['q', 'w', 'e', 'a', 'd', 'z', 'x', 'c'],
-        'd': ['w', 'e', 'r', 's', 'f', 'x', 'c', 'v'], 'f': ['e', 'r', 't', 'd', 'g', 'c', 'v', 'b'],
-        'g': ['r', 't', 'y', 'f', 'h', 'v', 'b', 'n'], 'h': ['t', 'y', 'u', 'g', 'j', 'b', 'n', 'm'],
-        'j': ['y', 'u', 'i', 'h', 'k', 'n', 'm', ','], 'k': ['u', 'i', 'o', 'j', 'l', 'm', ',', '.'],
-        'l': ['i', 'o', 'p', 'k', ';', ',', '.', '/'], ';': ['o', 'p', '[', 'l', "'", '.', '/'],
-        "'": ['p', '[', ']', ';', '/'],
-        # Bottom Row
-        'z': ['a', 's', 'x'], 'x': ['a', 's', 'd', 'z', 'c'], 'c': ['s', 'd', 'f', 'x', 'v'],
-        'v': ['d', 'f', 'g', 'c', 'b'], 'b': ['f', 'g', 'h', 'v', 'n'], 'n': ['g', 'h', 'j', 'b', 'm'],
-        'm': ['h', 'j', 'k', 'n', ','], ',': ['j', 'k', 'l', 'm', '.'], '.': ['k', 'l', ';', ',', '/'],
-        '/': ['l', ';', "'", '.']
-    }
+
+@dataclass
+class Checkpoint:
+    """How far a typing run got. Everything before offset was typed correctly."""
+    offset: int = 0
+    typed: int = 0  # chars sent, including the unconfirmed run after a pending typo
+    pending_typo: Optional[int] = None  # index of a typo that was not corrected yet
 
 
 # --- orchestrator class ---
 class Algorithm:
-    def __init__(self, page, config: Optional[Config] = None):
-        self.mod = Modules(config)
+    def __init__(self, page, config: Optional[Config] = None, quiet: bool = False, interactive: bool = True,
+                 tracer=None, event_log=None, tracker=None, keyboard=None, channel=None, ui_loop=None):
+        self.mod = Modules(config, tracer, event_log)
+        self.tracker = tracker  # tracker.PageTracker, lets a restart wait for a click instead of Enter
+        self.quiet = quiet  # no progress rendering at all
+        self.interactive = interactive  # take pause/restart commands from stdin
+        # where commands come from (the running loop's control.StdinChannel by default) and the
+        # loop progress is rendered on, for running on engine.EngineThread
+        self._channel = channel
+        self.ui_loop = ui_loop
+        self.timer = self.mod.timer
+        self.typos = self.mod.typos
         self.page = page
+        # keyboard.py backend, Playwright's page.keyboard unless another one is passed
+        if keyboard is None:
+            from .keyboard import PlaywrightKeyboard
+            keyboard = PlaywrightKeyboard(page.keyboard)
+        self.keyboard = keyboard
+        if event_log is not None:
+            from .eventlog import LoggingKeyboard
+            self.keyboard = LoggingKeyboard(keyboard, event_log)
         self._is_paused = asyncio.Event()
         self._is_paused.set()
         self._restart_requested = False
         self.pause_requested = False
-        self.pause_task = None
-
-    def __getattr__(self, name):
-        return getattr(self.mod, name)
-
-    async def _handle_pause_prompt(self, status):
+        self.checkpoint: Optional[Checkpoint] = None
+        self._base = 0  # chars typed before the current chunk when streaming
+        self.repair = None  # repair.RepairResult of the last verification
+        self.paused_seconds = 0.0  # time spent in the pause prompt, for throughput reports
+
+    async def _handle_pause_prompt(self, progress):
+        tracer = self.mod.tracer
+        if tracer is not None:
+            start = tracer.now()
+        paused_at = time.monotonic()
         self.pause_requested = False
-        status.stop()
+        progress.stop()
         console.clear()
         console.print("\n" + "─" * 30)
 
-        try:
-            Prompt.ask(
+        if not self._restart_requested:
+            console.print(
                 "[bold yellow]PAUSED[/bold yellow]\n"
                 "• Press [bold green]Enter[/bold green] to resume\n"
-                "• Press [bold red]Ctrl+C[/bold red] to restart",
-                password=True
+                "• Type [bold red]r[/bold red] + Enter or press [bold red]Ctrl+C[/bold red] to restart"
             )
-            console.print("[green]▶ Resuming...[/green]")
-            if self.pause_task:
-                self.pause_task.cancel()
-        except KeyboardInterrupt:
-            self._restart_requested = True
+            if await self._wait_for_resume() == RESTART:
+                self._restart_requested = True
+        if self._restart_requested:
             console.print("\n[bold magenta]↺ Restarting...[/bold magenta]")
-            await wait_for_navigate()
-        finally:
-            self.pause_task = asyncio.create_task(listen_for_pause(self))
-            console.clear()
+            if self.interactive:
+                await wait_for_navigate(self.tracker, self.channel)
+        else:
+            console.print("[green]▶ Resuming...[/green]")
+            # time spent paused is not a stall to catch up on
+            self.timer.scheduler.reset()
+        console.clear()
         if not self._restart_requested:
-            status.start()
+            progress.start()
             console.print("─" * 30 + "\n")
+        self.paused_seconds += time.monotonic() - paused_at
+        if tracer is not None:
+            tracer.span("pause", start)
+
+    async def _wait_for_resume(self) -> str:
+        """Blocks until the user resumes or restarts. Ctrl+C counts as restart while paused."""
+        if not self.interactive:
+            return RESUME
+        channel = self.channel
+        restart = asyncio.get_running_loop().create_future()
+        with channel.on_sigint(lambda: restart.done() or restart.set_result(RESTART)):
+            line = asyncio.ensure_future(channel.readline(hidden=True))
+            await asyncio.wait((line, restart), return_when=asyncio.FIRST_COMPLETED)
+        if not line.done():
+            line.cancel()
+            return RESTART
+        try:
+            return parse_command(line.result(), paused=True)
+        except EOFError:
+            return RESUME  # nobody left to resume us
 
-    async def type_text(self, text: str):
-        self.pause_task = asyncio.create_task(listen_for_pause(self))
-
-        while True:
-            self._restart_requested = False
-            self.typos.reset()
-            total_chars = len(text)
-            self.mod.typed_count = 0
-            try:
-                msg = "[bold blue]Currently typing, progress: 0.00%. Press enter to pause.[/bold blue]"
-                with console.status(msg, spinner="bouncingBall") as status:
-
-                    for idx, raw_char in enumerate(text):
-                        if self.pause_requested or self._restart_requested:
-                            await self._handle_pause_prompt(status)
-
-                        if self._restart_requested:
-                            break
-
-                        await self._is_paused.wait()
-                        if raw_char == "\r": continue
-                        char = "\n" if raw_char == "\n" else raw_char
-
-                        # lifecycle call
-                        char_to_type = await self.mod.process_lifecycle(self.page.keyboard, char, idx)
-
-                        # Calculate delay based on the original intended character
-                        delay = self.timer.get_delay(char)
-
-                        # Send the final character
-                        await self.mod.send_char(self.page.keyboard, char_to_type, delay)
-
-                        self.mod.typed_count += 1
-                        percent = (self.mod.typed_count / total_chars) * 100
-                        status.update(f"[bold blue]Currently typing, progress: {percent:.2f}%.[/bold blue]")
-
-                if not self._restart_requested:
-                    await self.mod.post_lifecycle(self.page.keyboard)
-                    console.print("[bold green]✔ Finished typing[/bold green]")
-                    if self.pause_task: self.pause_task.cancel()
-                    break
+    @property
+    def channel(self):
+        return self._channel or get_channel()
 
-            except Exception as e:
-                console.print(f"[red]Error: {e}[/red]")
-                raise
+    def _on_command(self, line: str):
+        if parse_command(line, paused=False) == PAUSE:
+            self.request_pause()
+        else:
+            self.request_restart()
+
+    def build_plan(self, text: str):
+        from .plan import TypingPlan
+        return TypingPlan.build(text, self.mod.config, self.mod.rng)
+
+    async def type_text(self, text: str, plan=None):
+        """Types text into the page. A prebuilt ``TypingPlan`` can be passed to skip planning."""
+        text = text.replace("\r", "")
+
+        async def whole():
+            yield 0, len(text), text
+
+        await self._type_chunks(whole(), len(text), plan=plan)
+        if self.mod.config.verify:
+            await self.verify(text)
+
+    async def type_stream(self, source):
+        """Types a ``source.TextSource`` one chunk at a time; only the current chunk is held.
+
+        A ``richtext.RichTextSource`` works the same way, its ``FormatCommand``s between
+        chunks are pressed as shortcuts.
+
+        Pending typos are corrected at the end of every chunk, so a restart never has to
+        look back into a chunk that is already gone. Verification needs the whole source,
+        so it is skipped here.
+        """
+        await self._type_chunks(source.chunks(), source.total_bytes, streamed=True)
+
+    async def _type_chunks(self, chunks, total: Optional[int], streamed: bool = False, plan=None):
+        """The typing loop behind type_text and type_stream.
+
+        chunks yields ``(start, end, text)`` as ``source.TextSource.chunks()`` does. total is
+        in chars, or in bytes (None if unknown) when streamed; progress then moves through
+        each chunk's byte range. plan is a prebuilt ``TypingPlan`` for a single chunk.
+        """
+        from .plan import TypingPlan
+        from .progress import ProgressRenderer
+
+        config = self.mod.config
+        keyboard = self.keyboard
+        self.typos.reset()
+        self.timer.scheduler.reset()
+        self.mod.typed_count = 0
+        span = [0, 0, 1]  # byte range and length of the current chunk, for byte-offset progress
+
+        def position() -> int:
+            start_byte, end_byte, length = span
+            return start_byte + (end_byte - start_byte) * (self.mod.typed_count - self._base) // length
+
+        if self.interactive:
+            self.channel.handler = self._on_command
+        progress = None
+        try:
+            async for start_byte, end_byte, chunk in chunks:
+                if not isinstance(chunk, str):
+                    # richtext.FormatCommand, after the previous chunk's typos were corrected
+                    await keyboard.press(chunk.key)
+                    await self.timer.sleep(self.timer.get_short_pause())
+                    continue
+                self._base = self.mod.typed_count
+                span[:] = start_byte, end_byte, len(chunk) or 1
+                if progress is None:
+                    progress = ProgressRenderer(self.mod, chunk, total, quiet=self.quiet,
+                                                position=position if streamed else None, loop=self.ui_loop)
+                    progress.start()
+                if config.bulk_insert:
+                    plan = None
+                elif plan is None and config.use_plan:
+                    plan = TypingPlan.build(chunk, config, self.mod.rng, offset=self._base)
+                start = 0
+                while True:
+                    self._restart_requested = False
+                    if config.bulk_insert:
+                        await self._run_bulk(chunk, progress, start)
+                    elif plan is not None:
+                        await self._run_plan(plan, progress, start)
+                    else:
+                        await self._run_text(chunk, progress, start)
+                    if not self._restart_requested:
+                        break
+                    self.typos.reset()
+                    self.timer.scheduler.reset()
+                    start = await self._resume_offset(chunk)
+                    self.mod.typed_count = self._base + start
+                    progress.start()
+                plan = None
+                await self.mod.post_lifecycle(keyboard)
+            await keyboard.flush()
+        except Exception as e:
+            console.print(f"[red]Error: {e}[/red]")
+            raise
+        finally:
+            if progress is not None:
+                progress.stop()
+            self._base = 0
+            if self.interactive:
+                self.channel.handler = None
+        console.print("[bold green]✔ Finished typing[/bold green]")
+
+    async def verify(self, text: str):
+        """Compares the target with text and repairs only the ranges that differ."""
+        from .repair import verify_and_repair
+
+        self.repair = result = await verify_and_repair(self.page, self.keyboard, text)
+        if not result.readable:
+            console.print("[dim]Can't read the target back, skipping verification.[/dim]")
+        elif result.unsafe:
+            console.print(f"[red]The target differs from the source in {result.differing} characters, too many to "
+                          "repair safely. Is the right element focused?[/red]")
+        elif result.verified and not result.edits:
+            console.print("[green]✔ Verified, the target matches the source.[/green]")
+        elif result.verified:
+            console.print(f"[yellow]Repaired {result.repaired} characters in {result.edits} edits.[/yellow]")
+        else:
+            console.print(f"[red]The target still differs from the source after {result.edits} edits.[/red]")
+        return result
+
+    async def _resume_offset(self, text: str) -> int:
+        """Where to continue in text after a restart, read back from the target element.
+
+        Falls back to 0 (retype everything) when the target can't be read or doesn't
+        start with what we typed, e.g. after navigating to a new document. When streaming,
+        text is the current chunk and only the part of the target after the earlier
+        chunks is compared, so the fallback retypes just this chunk.
+        """
+        from .target import common_prefix_length, read_target_text
+
+        checkpoint = self.checkpoint
+        base = self._base
+        await self.keyboard.flush()
+        current = await read_target_text(self.page)
+        if not current or checkpoint is None or len(current) < base:
+            return 0
+        current = current[base:]
+        matched = common_prefix_length(current, text[:checkpoint.offset - base])
+        leftover = len(current) - matched
+        # only remove what we typed after the match ourselves (an uncorrected typo and the chars after it)
+        if matched == 0 or leftover > checkpoint.typed - base - matched:
+            return 0
+        await self.keyboard.backspace(leftover)
+        console.print(f"[magenta]Resuming at character {base + matched}.[/magenta]")
+        return matched
+
+    async def _run_text(self, text: str, progress, start: int = 0):
+        base = self._base
+        for idx in range(start, len(text)):
+            if self.pause_requested or self._restart_requested:
+                await self._handle_pause_prompt(progress)
+
+            if self._restart_requested:
+                typos = self.typos
+                pending = self.mod.typed_count - len(typos.backlog) - 1 if typos.is_correction_pending else None
+                self.checkpoint = Checkpoint(pending if pending is not None else self.mod.typed_count,
+                                             self.mod.typed_count, pending)
+                return
+
+            await self._is_paused.wait()
+            char = text[idx]
+
+            # lifecycle call
+            char_to_type = await self.mod.process_lifecycle(self.keyboard, char, base + idx)
+
+            # Calculate delay based on the original intended character
+            delay = self.timer.get_delay(char)
+
+            # Send the final character
+            await self.mod.send_char(self.keyboard, char_to_type, delay)
+
+            self.mod.typed_count += 1
+
+    async def _run_plan(self, plan, progress, start: int = 0):
+        """Walks a precomputed plan; no random draws or module hooks per character."""
+        text, delays = plan.text, plan.delays
+        total_chars = len(text)
+        keyboard = self.keyboard
+        send_char = self.mod.send_char
+        first = bisect.bisect_left(plan.typo_index, start)
+        events = itertools.islice(zip(plan.typo_index, plan.typo_chars, plan.typo_steps, plan.typo_pauses),
+                                  first, None)
+        next_typo = next(events, None)
+        pending = None  # (typo index, correct at, pause) of the typo waiting to be fixed
+
+        for idx in range(start, total_chars):
+            if self.pause_requested or self._restart_requested:
+                await self._handle_pause_prompt(progress)
+
+            if self._restart_requested:
+                typo_idx = self._base + pending[0] if pending is not None else None
+                self.checkpoint = Checkpoint(self._base + idx if typo_idx is None else typo_idx, self._base + idx,
+                                             typo_idx)
+                return
+
+            await self._is_paused.wait()
+            if pending is not None and pending[1] == idx:
+                await self._correct_planned(keyboard, plan, pending, idx)
+                pending = None
+
+            if next_typo is not None and next_typo[0] == idx:
+                typo_idx, typo_char, steps, pause = next_typo
+                pending = (typo_idx, typo_idx + steps + 1, pause)
+                next_typo = next(events, None)
+                await send_char(keyboard, typo_char, delays[idx])
+            else:
+                await send_char(keyboard, text[idx], delays[idx])
+
+            self.mod.typed_count += 1
+
+        if pending is not None:
+            await self._correct_planned(keyboard, plan, pending, total_chars)
+
+    async def _run_bulk(self, text: str, progress, start: int = 0):
+        """Sends whole runs between Enter presses with a single insert_text each."""
+        keyboard = self.keyboard
+        chunk_size = max(1, self.mod.config.max_chunk_size)
+
+        for line_no, line in enumerate(text[start:].split("\n")):
+            if line_no:
+                await self.mod.send_char(keyboard, "\n", self.timer.get_run_delay(1))
+                self.mod.typed_count += 1
+            for chunk_start in range(0, len(line), chunk_size):
+                # chunk boundaries are the only places a pause or restart can happen
+                if self.pause_requested or self._restart_requested:
+                    await self._handle_pause_prompt(progress)
+                if self._restart_requested:
+                    self.checkpoint = Checkpoint(self.mod.typed_count, self.mod.typed_count)
+                    return
+                await self._is_paused.wait()
+
+                chunk = line[chunk_start:chunk_start + chunk_size]
+                await keyboard.insert_text(chunk)
+                await self.timer.sleep(self.timer.get_run_delay(len(chunk)))
+
+                self.mod.typed_count += len(chunk)
+
+    async def _correct_planned(self, keyboard, plan, pending, end: int):
+        # same keystrokes as Typo.perform_correction, reusing the planned delays for the retyped run
+        tracer = self.mod.tracer
+        if tracer is not None:
+            start = tracer.now()
+        typo_idx, _, short_pause = pending
+        for _ in range(end - typo_idx):
+            await keyboard.press("Backspace")
+            await self.timer.sleep(short_pause * 2.5)
+        await self.mod.send_char(keyboard, plan.text[typo_idx], short_pause)
+        for i in range(typo_idx + 1, end):
+            await self.mod.send_char(keyboard, plan.text[i], plan.delays[i])
+        if tracer is not None:
+            tracer.span("correction", start)
 
     def request_pause(self):
         self.pause_requested = True
+
+    def request_restart(self):
+        self._restart_requested = True
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+import asyncio
+import hashlib
+import sys
+from typing import Optional, Tuple
+
+import klembord
+from Xlib import display, error
+from Xlib.ext import xfixes
+
+
+def payload_hash(paste) -> bytes:
+    """Cheap fingerprint of a (plain, html) clipboard payload."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in paste or ():
+        if part:
+            digest.update(part.encode("utf-8", "surrogatepass"))
+        digest.update(b"\0")
+    return digest.digest()
+
+
+class ClipboardWatcher:
+    """Waits for clipboard changes through X11 XFixes selection-owner notifications.
+
+    Nothing is read while the clipboard is idle. Contents are fetched only when another
+    client takes ownership of the selection, and only a hash of the last payload is kept.
+    """
+
+    def __init__(self, selection: str = "CLIPBOARD"):
+        self.selection = selection
+        self._display: Optional[display.Display] = None
+        self._last_hash: Optional[bytes] = None
+
+    def open(self) -> bool:
+        """Subscribes to owner changes. Returns False if XFixes isn't available."""
+        if sys.platform.startswith("win"):
+            return False
+        try:
+            self._display = display.Display()
+            if not self._display.has_extension("XFIXES"):
+                self.close()
+                return False
+            self._display.xfixes_query_version()
+            self._display.xfixes_select_selection_input(self._display.screen().root,
+                                                        self._display.get_atom(self.selection),
+                                                        xfixes.XFixesSetSelectionOwnerNotifyMask)
+            self._display.flush()
+        except (error.DisplayError, error.XError):
+            self.close()
+            return False
+        return True
+
+    def close(self):
+        if self._display is not None:
+            self._display.close()
+            self._display = None
+
+    def remember(self, paste):
+        """Sets the payload that doesn't count as a change."""
+        self._last_hash = payload_hash(paste)
+
+    def _owner_changed(self) -> bool:
+        changed = False
+        owner_event = self._display.extension_event.SetSelectionOwnerNotify
+        while self._display.pending_events():
+            event = self._display.next_event()
+            # owner 0 means the selection was dropped, there is nothing to read. event.owner is a
+            # Window resource, which is always truthy, so its id is what to test
+            if (event.type, getattr(event, "sub_code", None)) == owner_event and event.owner.id:
+                changed = True
+        return changed
+
+    async def wait_for_change(self) -> Tuple[str, str]:
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        fd = self._display.fileno()
+        loop.add_reader(fd, readable.set)
+        try:
+            while True:
+                await readable.wait()
+                readable.clear()
+                if not self._owner_changed():
+                    continue
+                paste = await asyncio.to_thread(klembord.get_with_rich_text)
+                digest = payload_hash(paste)
+                if digest != self._last_hash:
+                    self._last_hash = digest
+                    return paste
+        finally:
+            loop.remove_reader(fd)
+
+
+async def poll_for_change(interval: float = 0.1) -> Tuple[str, str]:
+    """Fallback when XFixes isn't available: compare the clipboard every interval."""
+    last_hash = payload_hash(klembord.get_with_rich_text())
+    while True:
+        current_paste = await asyncio.to_thread(klembord.get_with_rich_text)
+        if payload_hash(current_paste) != last_hash:
+            return current_paste
+        await asyncio.sleep(interval)
+
+
+async def wait_for_clipboard_change() -> Tuple[str, str]:
+    watcher = ClipboardWatcher()
+    if not watcher.open():
+        return await poll_for_change()
+    try:
+        watcher.remember(klembord.get_with_rich_text())
+        return await watcher.wait_for_change()
+    finally:
+        watcher.close()
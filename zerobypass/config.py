@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 import argparse
-import logging
 
 from rich.console import Console
 
@@ -9,8 +8,6 @@ console = Console()
 WINDOW_SECONDS = 5
 LAST_SIG_TIME = 0.0
 
-logging.getLogger("playwright").setLevel(logging.ERROR)  # TODO: verify if this actually does anything
-
 disclaimer = """
 
 **Disclaimer — Research & Testing Only**
@@ -24,8 +21,83 @@ Use of this project is at your own risk. The authors and contributors accept no
 If you require a version of this project for legitimate educational purposes, please contact the maintainers to discuss appropriate licensing, attribution, and oversight.
 """
 
-parser = argparse.ArgumentParser(
-    description="Proof of concept tool to bypass document replay technology (such as gpt zero).")
-parser.add_argument("--browser-data-dir", "-d",
-                    help="Specify a custom browser directory to use for the Playwright browser.")
-args = parser.parse_args()
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Proof of concept tool to bypass document replay technology (such as gpt zero).")
+    parser.add_argument("--browser-data-dir", "-d",
+                        help="Specify a custom browser directory to use for the Playwright browser.")
+    browser = parser.add_argument_group("browser")
+    browser.add_argument("--lean", action="store_true",
+                         help="Launch Chromium without background services, extensions and GPU compositing "
+                              "to keep long sessions small.")
+    browser.add_argument("--block-resources", nargs="?", const="image,media,font", metavar="TYPES",
+                         help="Abort requests of these comma separated resource types (default: image,media,font).")
+    browser.add_argument("--keyboard", choices=("playwright", "cdp"), default="playwright",
+                         help="How keystrokes reach the page: Playwright's keyboard API, or raw CDP Input "
+                              "commands sent without waiting for each reply (lower per-keystroke overhead).")
+    browser.add_argument("--memory-interval", type=float, metavar="SECONDS",
+                         help="Sample the browser's JS heap every SECONDS and report when it grows.")
+    parser.add_argument("--plan", action="store_true",
+                        help="Precompute every delay and typo before typing starts.")
+    parser.add_argument("--bulk", action="store_true",
+                        help="Fill text in large chunks without delays or typos (for fast test fills).")
+    parser.add_argument("--rich", action="store_true",
+                        help="Keep the clipboard's bold, italic and underline by pressing the editor's shortcuts "
+                             "(Ctrl+B/I/U) while typing.")
+    parser.add_argument("--input", "-i", metavar="FILE",
+                        help="Type the contents of FILE (or stdin with '-') instead of the clipboard. "
+                             "The file is streamed, so typing starts right away even for huge inputs.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--target-duration", metavar="DURATION",
+                        help="Scale the delays so the text takes about DURATION to type (e.g. 90m, 1h30m, 600).")
+    target.add_argument("--target-cpm", type=float, metavar="CPM",
+                        help="Scale the delays so the text is typed at about CPM characters per minute.")
+    parser.add_argument("--quiet", "-q", action="store_true",
+                        help="Don't render typing progress (for unattended runs).")
+    parser.add_argument("--verify", action="store_true",
+                        help="Read the target back after typing and repair small differences from the source.")
+    parser.add_argument("--seed", type=int,
+                        help="Seed every random delay and typo, so a run over the same text can be reproduced.")
+    parser.add_argument("--layout", default="qwerty", metavar="NAME",
+                        help="Keyboard layout typos are picked from: a layout in zerobypass/layouts or a JSON "
+                             "file in the same format (default: qwerty).")
+    parser.add_argument("--record", metavar="FILE",
+                        help="Write every keystroke and delay of the job to FILE as a compact event log "
+                             "(see zerobypass/eventlog.py), for replaying it later.")
+    parser.add_argument("--trace", metavar="DIR",
+                        help="Record keystroke, sleep, correction and pause timings and write a JSON summary "
+                             "and a Chrome trace file into DIR after each job.")
+    daemon = parser.add_argument_group("daemon mode")
+    daemon.add_argument("--daemon", action="store_true",
+                        help="Keep the browser running and accept jobs over a Unix domain socket.")
+    daemon.add_argument("--socket", help="Socket path for --daemon and --submit.")
+    daemon.add_argument("--concurrency", type=int, default=4,
+                        help="How many jobs the daemon types at the same time.")
+    daemon.add_argument("--submit", metavar="FILE",
+                        help="Send the text in FILE ('-' for stdin) to a running daemon and show its progress.")
+    daemon.add_argument("--url", help="With --submit: open this URL in a new tab and type there.")
+    daemon.add_argument("--selector", help="With --submit: click this element before typing.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print how long each heavy import takes before starting.")
+    return parser
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.bulk and (args.target_duration or args.target_cpm):
+        parser.error("--bulk types without delays and can't be combined with --target-duration or --target-cpm")
+    if args.rich and args.input:
+        parser.error("--rich types the clipboard's HTML and can't be combined with --input")
+    if args.input and args.input != "-":
+        try:
+            with open(args.input, "rb"):
+                pass
+        except OSError as e:
+            parser.error(f"Can't read --input {args.input}: {e.strerror or e}")
+    from .layout import load_layout
+    try:
+        load_layout(args.layout)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""One long-lived stdin reader for the whole session.
+
+Lines typed into the terminal either go to whoever is awaiting ``readline()`` (prompts
+like "press Enter to start") or, when nobody is, to the current ``handler`` as a command
+(the typing engine's pause/restart). On POSIX the reader is registered with the event
+loop through ``add_reader``; where that isn't possible (Windows consoles, regular files)
+a single daemon thread feeds lines into the loop instead. Either way there is exactly
+one reader per process, no matter how often the user pauses.
+"""
+import asyncio
+import contextlib
+import os
+import signal
+import sys
+import threading
+from collections import deque
+from typing import Callable, Deque, Optional
+
+PAUSE, RESUME, RESTART = "pause", "resume", "restart"
+RESTART_WORDS = frozenset(("r", "restart"))
+
+
+def parse_command(line: str, paused: bool) -> str:
+    """Enter (or anything else) toggles pause/resume, ``r``/``restart`` restarts."""
+    if line.strip().lower() in RESTART_WORDS:
+        return RESTART
+    return RESUME if paused else PAUSE
+
+
+class StdinChannel:
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdin
+        self.handler: Optional[Callable[[str], None]] = None
+        self.closed = False  # stdin hit EOF
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._fd: Optional[int] = None
+        self._partial = b""
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def open(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self._loop = loop or asyncio.get_running_loop()
+        try:
+            fd = self.stream.fileno()
+            self._loop.add_reader(fd, self._on_readable)
+            self._fd = fd
+        except (AttributeError, OSError, ValueError, NotImplementedError):
+            # no selectable fd: Windows console, regular file, or an io object without one
+            threading.Thread(target=self._read_thread, name="zerobypass-stdin", daemon=True).start()
+
+    def close(self):
+        if self._fd is not None and self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self._fd)
+        self._fd = None
+
+    # --- feeding lines in ---
+    def _on_readable(self):
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self.close()
+            partial, self._partial = self._partial, b""
+            if partial:
+                # a last line without a newline, e.g. printf r | zerobypass
+                self._dispatch(partial.decode(errors="replace"))
+            self._eof()
+            return
+        *lines, self._partial = (self._partial + data).split(b"\n")
+        for line in lines:
+            self._dispatch(line.decode(errors="replace"))
+
+    def _read_thread(self):
+        while True:
+            try:
+                line = self.stream.readline()
+            except (OSError, ValueError):
+                line = ""
+            if self._loop.is_closed():
+                return
+            if not line:
+                self._loop.call_soon_threadsafe(self._eof)
+                return
+            self._loop.call_soon_threadsafe(self._dispatch, line.rstrip("\r\n"))
+
+    def _dispatch(self, line: str):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(line)
+                return
+        if self.handler is not None:
+            self.handler(line)
+
+    def _eof(self):
+        self.closed = True
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(EOFError())
+
+    # --- consuming ---
+    async def readline(self, hidden: bool = False) -> str:
+        """Next line from stdin, without the newline. ``hidden`` turns off terminal echo while waiting."""
+        if self.closed:
+            raise EOFError()
+        waiter = self._loop.create_future()
+        self._waiters.append(waiter)
+        with (no_echo(self.stream) if hidden else contextlib.nullcontext()):
+            return await waiter
+
+    @contextlib.contextmanager
+    def on_sigint(self, callback: Callable[[], None]):
+        """Calls callback on Ctrl+C instead of interrupting the program, for the duration of the block."""
+        previous = signal.getsignal(signal.SIGINT)
+        try:
+            self._loop.add_signal_handler(signal.SIGINT, callback)
+        except (NotImplementedError, RuntimeError, ValueError):
+            # Windows or not the main thread: Ctrl+C keeps its usual meaning
+            yield
+            return
+        try:
+            yield
+        finally:
+            self._loop.remove_signal_handler(signal.SIGINT)
+            signal.signal(signal.SIGINT, previous)
+
+
+@contextlib.contextmanager
+def no_echo(stream):
+    try:
+        import termios
+    except ImportError:
+        yield  # termios is POSIX only
+        return
+    try:
+        fd = stream.fileno()
+        attrs = termios.tcgetattr(fd)
+    except (AttributeError, OSError, ValueError, termios.error):
+        # a pipe has no echo to turn off
+        yield
+        return
+    quiet = attrs[:]
+    quiet[3] &= ~termios.ECHO
+    termios.tcsetattr(fd, termios.TCSANOW, quiet)
+    try:
+        yield
+    finally:
+        termios.tcsetattr(fd, termios.TCSANOW, attrs)
+
+
+_channel: Optional[StdinChannel] = None
+_stream = None
+
+
+def use_terminal():
+    """Reads prompts and commands from the terminal instead of stdin, for when stdin carries the text.
+
+    Returns the opened terminal stream so blocking prompts can read from it too.
+    """
+    global _stream
+    _stream = open("CONIN$" if sys.platform.startswith("win") else "/dev/tty", encoding="utf-8")
+    return _stream
+
+
+def get_channel() -> StdinChannel:
+    """The session's channel, opened on the running loop the first time it's needed."""
+    global _channel
+    loop = asyncio.get_running_loop()
+    if _channel is None or _channel._loop is not loop:
+        if _channel is not None:
+            _channel.close()
+        _channel = StdinChannel(_stream)
+        _channel.open(loop)
+    return _channel
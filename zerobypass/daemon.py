@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Headless daemon: keeps the browser warm and takes jobs over a Unix domain socket.
+
+The protocol is newline-delimited JSON. Each request line is one job::
+
+    {"text": "...", "url": "https://...", "selector": "#editor", "config": {"min_delay": 0.02}}
+
+``url`` opens a new tab, ``page`` picks an open tab by index, and without either the
+job types into the current tab. ``selector`` is clicked before typing. ``config``
+overrides fields of the daemon's Config. Events are streamed back, one JSON object per
+line, all tagged with the job ``id``: ``accepted``, ``progress`` (typed/total), then
+``done`` or ``error``.
+"""
+import asyncio
+import itertools
+import json
+import os
+import pathlib
+import socket
+from dataclasses import fields, replace
+from typing import Optional
+
+from .algorithm import Config
+from .config import console
+from .jobs import Job, JobQueue
+
+PROGRESS_INTERVAL = 0.25
+MAX_REQUEST_SIZE = 256 * 1024 * 1024  # one request line, the whole job text is in it
+
+
+def default_socket_path() -> str:
+    runtime = os.environ.get("XDG_RUNTIME_DIR") or pathlib.Path.home() / ".cache" / "zerobypass"
+    return str(pathlib.Path(runtime) / "zerobypass.sock")
+
+
+def apply_overrides(config: Config, overrides: Optional[dict]) -> Config:
+    if not overrides:
+        return config
+    known = {f.name for f in fields(Config)}
+    unknown = set(overrides) - known
+    if unknown:
+        raise ValueError(f"Unknown config fields: {', '.join(sorted(unknown))}")
+    # JSON has no tuples
+    values = {k: tuple(v) if isinstance(v, list) else v for k, v in overrides.items()}
+    return replace(config, **values)
+
+
+class Daemon:
+    def __init__(self, pw, socket_path: Optional[str] = None, concurrency: int = 4,
+                 config: Optional[Config] = None, trace_dir: Optional[str] = None, keyboard: str = "playwright"):
+        self.pw = pw
+        self.socket_path = socket_path or default_socket_path()
+        self.config = config or Config()
+        self.queue = JobQueue(pw, concurrency, self.config, trace_dir, keyboard)
+        self._ids = itertools.count(1)
+
+    async def serve_forever(self):
+        path = pathlib.Path(self.socket_path)
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        path.unlink(missing_ok=True)  # stale socket from a previous run
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # bound with 0600 from the start, a chmod afterwards leaves a window where anyone can connect
+        umask = os.umask(0o177)
+        try:
+            sock.bind(str(path))
+        except OSError:
+            sock.close()
+            raise
+        finally:
+            os.umask(umask)
+        server = await asyncio.start_unix_server(self._handle, sock=sock, limit=MAX_REQUEST_SIZE)
+        console.print(f"[bold]Daemon listening on[/bold] {path}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.queue.close()
+            path.unlink(missing_ok=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        write_lock = asyncio.Lock()
+
+        async def send(event: dict):
+            async with write_lock:
+                writer.write(json.dumps(event).encode() + b"\n")
+                await writer.drain()
+
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # the rest of the line is still in the stream, so this connection is done
+                    await send({"id": next(self._ids), "event": "error",
+                                "message": f"Request too large (the limit is {MAX_REQUEST_SIZE} bytes)"})
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(self._run_request(line, send))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _run_request(self, line: bytes, send):
+        job_id = next(self._ids)
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict) or not isinstance(request.get("text"), str):
+                raise ValueError('"text" has to be a string')
+            job = Job(text=request["text"], url=request.get("url"), selector=request.get("selector"),
+                      config=apply_overrides(self.config, request.get("config")))
+            if job.url is None:
+                if "page" in request:
+                    job.page = self.pw.browser.pages[int(request["page"])]
+                else:
+                    job.page = await self.pw.get_current_page()
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            await send({"id": job_id, "event": "error", "message": f"Bad request: {e}"})
+            return
+
+        total = len(job.text)
+        self.queue.submit(job)
+        await send({"id": job_id, "event": "accepted", "total": total})
+        while not job.done.done():
+            await asyncio.wait([job.done], timeout=PROGRESS_INTERVAL)
+            if job.algo is not None:
+                await send({"id": job_id, "event": "progress", "typed": job.algo.mod.typed_count, "total": total})
+        if job.done.cancelled():
+            await send({"id": job_id, "event": "error", "message": "Cancelled"})
+        elif job.done.exception():
+            await send({"id": job_id, "event": "error", "message": str(job.done.exception())})
+        else:
+            repair = job.algo.repair
+            await send({"id": job_id, "event": "done", "total": total,
+                        "repaired": repair.repaired if repair else 0})
+
+
+async def submit(socket_path: str, text: str, url: Optional[str] = None, selector: Optional[str] = None,
+                 overrides: Optional[dict] = None):
+    """Client side: sends one job and yields the daemon's events until it finishes."""
+    reader, writer = await asyncio.open_unix_connection(socket_path, limit=MAX_REQUEST_SIZE)
+    try:
+        request = {"text": text, "url": url, "selector": selector, "config": overrides}
+        writer.write(json.dumps({k: v for k, v in request.items() if v is not None}).encode() + b"\n")
+        await writer.drain()
+        while line := await reader.readline():
+            event = json.loads(line)
+            yield event
+            if event["event"] in ("done", "error"):
+                break
+        else:
+            yield {"event": "error", "message": "The daemon closed the connection"}
+    finally:
+        writer.close()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Runs the typing engine and its browser connection on an event loop of their own.
+
+The UI loop (prompts, the stdin channel, clipboard polling and progress rendering) stays
+on the main thread; ``EngineThread`` owns a second loop in a daemon thread, and every
+Playwright object is created and used there. The two sides only meet through
+thread-safe calls:
+
+* ``EngineThread.run(coro)`` awaits a coroutine on the engine loop from the UI loop.
+* ``ChannelBridge`` is the engine's view of the UI's ``control.StdinChannel``: commands
+  are handed over with ``call_soon_threadsafe`` and prompts are awaited across loops.
+* ``TrackerProxy`` lets UI prompts wait for a click reported to the engine's tracker.
+* Progress is read, not sent: ``ProgressRenderer`` runs on the UI loop and only reads
+  the engine's counters.
+
+A slow terminal or a busy UI loop can then no longer delay a keystroke.
+"""
+import asyncio
+import concurrent.futures
+import contextlib
+import threading
+from typing import Callable, Optional
+
+
+class EngineStopped(RuntimeError):
+    """The engine loop stopped (e.g. the browser failed to launch) while something waited on it."""
+
+
+async def call_in(loop: asyncio.AbstractEventLoop, coro):
+    """Runs coro on loop and awaits its result from the running loop. Cancelling the caller cancels coro."""
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+
+
+class EngineThread:
+    def __init__(self, name: str = "zerobypass-engine"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.stopped = False
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive() and not self.stopped
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        loop = self.loop
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            self.stopped = True
+            # whatever still runs is cancelled, so callers on the UI loop don't wait forever
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    async def run(self, coro):
+        """Awaits coro on the engine loop."""
+        if not self.running:
+            coro.close()
+            raise EngineStopped("The engine loop is not running")
+        try:
+            return await call_in(self.loop, coro)
+        except asyncio.CancelledError:
+            if self.stopped:
+                raise EngineStopped("The engine loop stopped") from None
+            raise
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        if self.running:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self._thread.is_alive() and threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+
+
+class ChannelBridge:
+    """A ``control.StdinChannel`` on the UI loop, usable from the engine loop.
+
+    Offers what the engine uses of a channel: ``handler``, ``readline`` and ``on_sigint``.
+    """
+
+    def __init__(self, channel, loop: asyncio.AbstractEventLoop):
+        self.channel = channel
+        self.loop = loop  # the UI loop the channel reads on
+        self._handler: Optional[Callable[[str], None]] = None
+
+    @property
+    def handler(self) -> Optional[Callable[[str], None]]:
+        return self._handler
+
+    @handler.setter
+    def handler(self, handler: Optional[Callable[[str], None]]):
+        self._handler = handler
+        forward = None
+        if handler is not None:
+            engine = asyncio.get_running_loop()
+
+            def forward(line: str):
+                engine.call_soon_threadsafe(handler, line)
+        self.loop.call_soon_threadsafe(setattr, self.channel, "handler", forward)
+
+    async def readline(self, hidden: bool = False) -> str:
+        return await call_in(self.loop, self.channel.readline(hidden))
+
+    @contextlib.contextmanager
+    def on_sigint(self, callback: Callable[[], None]):
+        engine = asyncio.get_running_loop()
+        release = concurrent.futures.Future()
+
+        async def hold():
+            # signal handlers can only be installed from the main thread's loop
+            with self.channel.on_sigint(lambda: engine.call_soon_threadsafe(callback)):
+                await asyncio.wrap_future(release)
+
+        asyncio.run_coroutine_threadsafe(hold(), self.loop)
+        try:
+            yield
+        finally:
+            release.set_result(None)
+
+
+class TrackerProxy:
+    """Waits for a ``tracker.PageTracker`` living on the engine loop from the UI loop."""
+
+    def __init__(self, tracker, engine: EngineThread):
+        self.tracker = tracker
+        self.engine = engine
+
+    async def wait_for_editable(self):
+        return await self.engine.run(self.tracker.wait_for_editable())
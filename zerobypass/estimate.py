@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Analytic timing model for a Config, mirroring Delay.get_delay and Typo."""
+import math
+import re
+from dataclasses import dataclass, replace
+from typing import Tuple
+
+from .algorithm import Config, PAUSE_CHARS, fatigue_multiplier
+
+
+def class_counts(text: str) -> Tuple[int, int, int]:
+    """Returns (typed chars, pause chars, spaces) for text."""
+    total = len(text) - text.count("\r")
+    pauses = sum(text.count(c) for c in PAUSE_CHARS)
+    return total, pauses, text.count(" ")
+
+
+def mean_char_delay(config: Config, pause_share: float = 0.0, space_share: float = 0.0) -> float:
+    """Expected delay per character before fatigue, given the share of pause chars and spaces."""
+    if not config.enable_jitter:
+        return config.min_delay
+    low, high = config.punctuation_pause
+    return (config.min_delay + config.max_delay) / 2 + pause_share * (low + high) / 2 + space_share * 0.04
+
+
+def fatigue_sum(config: Config, n: int) -> float:
+    """Sum of the fatigue multiplier over n typed chars, in closed form (n when fatigue is off)."""
+    if not config.enable_fatigue or n <= 0:
+        return float(max(n, 0))
+    interval, scale, cap = config.fatigue_interval, config.fatigue_scale, config.max_fatigue
+    full, rest = divmod(n, interval)
+    # levels up to log(cap)/log(scale) grow geometrically, the ones after sit at the cap
+    geometric = full
+    if scale > 1:
+        geometric = min(full, math.floor(math.log(cap) / math.log(scale)) + 1)
+    grown = geometric if scale == 1 else (scale ** geometric - 1) / (scale - 1)
+    return interval * (grown + (full - geometric) * cap) + rest * fatigue_multiplier(full, scale, cap)
+
+
+@dataclass
+class DurationEstimate:
+    typing: float  # seconds of keystroke delay, punctuation pauses and fatigue included
+    corrections: float  # seconds spent backspacing and retyping after typos
+    typos: float  # expected number of typos
+
+    @property
+    def total(self) -> float:
+        return self.typing + self.corrections
+
+
+def estimate_duration(config: Config, chars: int, pauses: int = 0, spaces: int = 0) -> DurationEstimate:
+    """Expected typing time for a text with these class counts, without running the engine."""
+    if chars <= 0:
+        return DurationEstimate(0.0, 0.0, 0.0)
+    fatigue = fatigue_sum(config, chars)
+    if config.bulk_insert:
+        per_char = (config.min_delay + config.max_delay) / 2 if config.enable_jitter else config.min_delay
+        return DurationEstimate(per_char * fatigue, 0.0, 0.0)
+
+    char_delay = mean_char_delay(config, pauses / chars, spaces / chars)
+    typing = char_delay * fatigue
+    if not config.enable_typos or config.backtrack_chance <= 0:
+        return DurationEstimate(typing, 0.0, 0.0)
+
+    # a typo can't start on whitespace or while another one waits to be corrected
+    chance = min(config.backtrack_chance, 1.0)
+    low, high = config.steps_till_backtrack
+    steps = (low + high) / 2
+    typos = max(chars - spaces - 3, 0) * chance / (1 + chance * steps)
+    # Typo.perform_correction: steps + 1 backspaces at 2.5 short pauses, the fixed char
+    # after one short pause, then the backlog again at normal (fatigued) speed
+    short_pause = (config.min_delay * 0.5 + config.max_delay * 1.5) / 2
+    per_typo = (steps + 1) * 2.5 * short_pause + short_pause + steps * char_delay * fatigue / chars
+    return DurationEstimate(typing, typos * per_typo, typos)
+
+
+def estimate_text(text: str, config: Config) -> DurationEstimate:
+    return estimate_duration(config, *class_counts(text))
+
+
+MAX_DOUBLINGS = 64  # solve_config scales delays by at most 2**64
+
+
+def scale_config(config: Config, factor: float) -> Config:
+    """config with every configurable delay multiplied by factor."""
+    low, high = config.punctuation_pause
+    return replace(config, min_delay=config.min_delay * factor, max_delay=config.max_delay * factor,
+                   punctuation_pause=(low * factor, high * factor))
+
+
+def solve_config(config: Config, target: float, chars: int, pauses: int = 0, spaces: int = 0,
+                 tolerance: float = 0.01) -> Tuple[Config, DurationEstimate]:
+    """Scales config's delays so a text with these class counts is expected to take target seconds.
+
+    Raises ValueError when the target is below what the fixed parts of the model (the
+    engine's unconfigurable pause after spaces) already take, or when config has no delay
+    that scaling could change.
+    """
+    def total(factor: float) -> float:
+        return estimate_duration(scale_config(config, factor), chars, pauses, spaces).total
+
+    floor = total(0.0)
+    if target <= floor:
+        raise ValueError(f"Can't type this text in under {format_duration(floor)}")
+    if total(1.0) <= floor:
+        raise ValueError("Every delay is zero, there is nothing to scale to the target")
+    low, high = 0.0, 1.0
+    for _ in range(MAX_DOUBLINGS):
+        if total(high) >= target:
+            break
+        high *= 2
+    else:
+        raise ValueError(f"Can't stretch this text to {format_duration(target)}")
+    factor = high
+    # the model is monotonic in the factor, bisect until within tolerance
+    for _ in range(64):
+        factor = (low + high) / 2
+        predicted = total(factor)
+        if abs(predicted - target) <= tolerance * target:
+            break
+        if predicted < target:
+            low = factor
+        else:
+            high = factor
+    scaled = scale_config(config, factor)
+    return scaled, estimate_duration(scaled, chars, pauses, spaces)
+
+
+def parse_duration(value: str) -> float:
+    """Seconds from "90", "45s", "20m" or "1h30m"."""
+    value = value.strip().lower()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = re.fullmatch(r"(?:(\d+(?:\.\d+)?)h)?(?:(\d+(?:\.\d+)?)m)?(?:(\d+(?:\.\d+)?)s)?", value)
+    if not value or parts is None:
+        raise ValueError(f"Not a duration: {value!r}")
+    hours, minutes, seconds = (float(p) if p else 0.0 for p in parts.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
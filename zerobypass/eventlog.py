@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Compact binary log of what the engine sent to the keyboard, and a replay executor.
+
+A log starts with ``MAGIC``, a version byte and the seed (varint, 0 when unseeded,
+otherwise the zigzag-encoded seed + 1, so negative seeds fit too). Then one record per
+event, an opcode byte followed by varints:
+
+    INSERT     length, UTF-8 bytes
+    ENTER
+    BACKSPACE  count (adjacent backspaces are merged)
+    PRESS      length, key name   (any other key)
+    DELAY      microseconds       (the delay the engine asked for, not what it slept)
+
+Replaying a log reproduces a run keystroke for keystroke without the random engine, so
+keyboard backends and scheduler changes can be compared on identical workloads.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from .scheduler import DeadlineScheduler
+
+MAGIC = b"ZBEL"
+VERSION = 2  # version 1 stored seed + 1 and couldn't hold negative seeds
+INSERT, ENTER, BACKSPACE, PRESS, DELAY = range(5)
+FLUSH_SIZE = 1 << 16
+
+
+def _varint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _encode_seed(seed: Optional[int]) -> int:
+    if seed is None:
+        return 0
+    return (seed * 2 if seed >= 0 else -seed * 2 - 1) + 1
+
+
+def _decode_seed(value: int) -> Optional[int]:
+    if not value:
+        return None
+    value -= 1
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+def _read_varint(data, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class EventLog:
+    """Collects events in a buffer, flushing to ``stream`` (if given) every 64 KiB."""
+
+    def __init__(self, stream: Optional[BinaryIO] = None, seed: Optional[int] = None):
+        self.stream = stream
+        self.buffer = bytearray(MAGIC)
+        self.buffer.append(VERSION)
+        _varint(self.buffer, _encode_seed(seed))
+        self._backspaces = 0
+
+    def _flush_backspaces(self):
+        if self._backspaces:
+            self.buffer.append(BACKSPACE)
+            _varint(self.buffer, self._backspaces)
+            self._backspaces = 0
+
+    def _maybe_flush(self):
+        if self.stream is not None and len(self.buffer) >= FLUSH_SIZE:
+            self.stream.write(self.buffer)
+            self.buffer.clear()
+
+    def insert(self, text: str):
+        self._flush_backspaces()
+        data = text.encode("utf-8", "surrogatepass")
+        self.buffer.append(INSERT)
+        _varint(self.buffer, len(data))
+        self.buffer += data
+        self._maybe_flush()
+
+    def press(self, key: str):
+        if key == "Backspace":
+            self._backspaces += 1
+            return
+        self._flush_backspaces()
+        if key == "Enter":
+            self.buffer.append(ENTER)
+        else:
+            data = key.encode()
+            self.buffer.append(PRESS)
+            _varint(self.buffer, len(data))
+            self.buffer += data
+        self._maybe_flush()
+
+    def backspace(self, count: int):
+        self._backspaces += count
+
+    def delay(self, seconds: float):
+        self._flush_backspaces()
+        self.buffer.append(DELAY)
+        _varint(self.buffer, max(0, round(seconds * 1e6)))
+        self._maybe_flush()
+
+    def getvalue(self) -> bytes:
+        """The whole log, when it isn't written to a stream."""
+        self._flush_backspaces()
+        return bytes(self.buffer)
+
+    def close(self):
+        self._flush_backspaces()
+        if self.stream is not None:
+            self.stream.write(self.buffer)
+            self.buffer.clear()
+            self.stream.close()
+
+
+class LoggingKeyboard:
+    """Passes calls through to the keyboard backend ``keyboard`` and records them in ``log``."""
+    __slots__ = ("keyboard", "log")
+
+    def __init__(self, keyboard, log: EventLog):
+        self.keyboard = keyboard
+        self.log = log
+
+    async def insert_text(self, text: str):
+        self.log.insert(text)
+        await self.keyboard.insert_text(text)
+
+    async def press(self, key: str):
+        self.log.press(key)
+        await self.keyboard.press(key)
+
+    async def backspace(self, count: int = 1):
+        self.log.backspace(count)
+        await self.keyboard.backspace(count)
+
+    async def flush(self):
+        await self.keyboard.flush()
+
+    async def close(self):
+        await self.keyboard.close()
+
+
+def read_header(data) -> Tuple[Optional[int], int]:
+    """Returns (seed, offset of the first event)."""
+    if bytes(data[:4]) != MAGIC:
+        raise ValueError("Not a zerobypass event log")
+    if data[4] not in (1, VERSION):
+        raise ValueError(f"Unsupported event log version {data[4]}")
+    seed, pos = _read_varint(data, 5)
+    if data[4] == 1:
+        return (seed - 1 if seed else None), pos
+    return _decode_seed(seed), pos
+
+
+def iter_events(data) -> Iterator[Tuple[int, object]]:
+    """Yields (opcode, argument): text for INSERT, key for PRESS, count for BACKSPACE,
+    seconds for DELAY and None for ENTER."""
+    _, pos = read_header(data)
+    end = len(data)
+    while pos < end:
+        op = data[pos]
+        pos += 1
+        if op == ENTER:
+            yield op, None
+            continue
+        value, pos = _read_varint(data, pos)
+        if op == INSERT:
+            yield op, bytes(data[pos:pos + value]).decode("utf-8", "surrogatepass")
+            pos += value
+        elif op == PRESS:
+            yield op, bytes(data[pos:pos + value]).decode()
+            pos += value
+        elif op == BACKSPACE:
+            yield op, value
+        elif op == DELAY:
+            yield op, value / 1e6
+        else:
+            raise ValueError(f"Unknown opcode {op} at byte {pos - 1}")
+
+
+@dataclass
+class ReplayStats:
+    events: int = 0
+    keyboard_calls: int = 0
+    chars: int = 0
+    delay: float = 0.0  # seconds of delay in the log
+
+
+async def replay(data, keyboard, realtime: bool = False, scheduler: Optional[DeadlineScheduler] = None) -> ReplayStats:
+    """Sends a logged run to a keyboard backend (see keyboard.py). Delays are slept only when realtime is set."""
+    stats = ReplayStats()
+    if realtime and scheduler is None:
+        scheduler = DeadlineScheduler()
+    for op, arg in iter_events(data):
+        stats.events += 1
+        if op == DELAY:
+            stats.delay += arg
+            if realtime:
+                await scheduler.wait(arg)
+            continue
+        if op == INSERT:
+            await keyboard.insert_text(arg)
+            stats.keyboard_calls += 1
+            stats.chars += len(arg)
+        elif op == ENTER:
+            await keyboard.press("Enter")
+            stats.keyboard_calls += 1
+            stats.chars += 1
+        elif op == BACKSPACE:
+            await keyboard.backspace(arg)
+            stats.keyboard_calls += arg
+        else:
+            await keyboard.press(arg)
+            stats.keyboard_calls += 1
+        if not realtime and stats.events % 4096 == 0:
+            await asyncio.sleep(0)  # don't starve the loop at max speed
+    await keyboard.flush()
+    return stats
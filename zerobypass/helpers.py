@@ -2,34 +2,39 @@
 import asyncio
 import sys
 
-import klembord
-from Xlib import display, error
-from rich.markdown import Markdown
-from rich.markup import escape
 from rich.panel import Panel
 from rich.prompt import Confirm, Prompt
 
 from .config import console, disclaimer
+from .control import get_channel
+
+# klembord, Xlib and rich.markdown are slow to import, they are only loaded when first needed
 
 
 # ------------------------------------------------
-def can_output_graphics():
+def can_output_graphics(stream=None):
+    """stream is where the prompt reads Enter from, the terminal when stdin carries the text."""
     if sys.platform.startswith("win"):
         # X11 displays are not available on Windows by default, so skip checking
         # If they don't have a display for some reason IDK why they would download this on a headless Windows environment lol
         return True
+    from Xlib import display, error
+
     try:
         display.Display()
     except (error.DisplayConnectionError, error.DisplayNameError):
         with console.status("[red]Unable to connect to graphical display. Press [bold]Enter[/bold] to continue anyway. Press [bold]CTRL-C[/bold] to exit.[/red]", spinner="star"):
-            Prompt.ask(password=True)
+            # getpass would write its prompt to stream, a given stream is read directly
+            Prompt.ask(password=stream is None, stream=stream)
     return True
 
-def handle_disclaimer():
+def handle_disclaimer(stream=None):
+    from rich.markdown import Markdown
+
     content = Markdown(disclaimer)
     panel = Panel(content, title="Disclaimer", border_style="red")
     console.print(panel)
-    accepted = Confirm.ask("Do you accept this disclaimer?", choices=["y", "n"])
+    accepted = Confirm.ask("Do you accept this disclaimer?", choices=["y", "n"], stream=stream)
 
     if accepted:
         console.clear()
@@ -38,55 +43,74 @@ def handle_disclaimer():
         sys.exit(0)
 
 
-async def get_text():
+async def get_text(config=None):
+    """Waits for a clipboard capture the user confirms. config is used for the duration estimate."""
+    import klembord
+    from Xlib import error
+
+    from .clipboard import wait_for_clipboard_change
+    from .preview import render_preview
+
     while True:
         try:
             with console.status("[bold]Copy[/bold] the text you want to use onto your clipboard [dim](CTRL-C)[/dim]",
                             spinner="bouncingBar"):
                 klembord.clear()  # avoid not copying due to copied content matching newly copied content
-                last_paste = klembord.get_with_rich_text()
-                while True:
-                    current_paste = await asyncio.to_thread(klembord.get_with_rich_text)
-                    if current_paste != last_paste:
-                        break
-                    await asyncio.sleep(0.1)  # small delay
+                current_paste = await wait_for_clipboard_change()
         except (error.DisplayConnectionError, error.DisplayNameError):
             console.print("[yellow]Clipboard access failed. Falling back to manual input.[/yellow]")
-            current_paste = await asyncio.to_thread(console.input, "Paste text here and press Enter:\n")
-        # Escape clipboard text to avoid Rich markup errors if user text contains markup-like tags.
-        # not to be confused with the library Rich (I mean Rich text, HTML, etc.)
-        safe_plain = current_paste[0] if current_paste and current_paste[0] else ""
-        safe_rich = escape(current_paste[1].strip()) if current_paste[1] else None
-        # show a 1/4 preview of the text in rich HTML format
-        rich_preview_len = len(safe_plain) // 4
-        preview = f"{safe_plain}{'\n [dim]' + safe_rich[:rich_preview_len] + '...[/dim]' if safe_rich else ''}"
-        console.print(Panel.fit(preview, title="Text Captured", border_style="green"))
-        confirm = Confirm.ask(f"Do you wish to continue with this capture or re-capture?", default=True,
-                              choices=["y", "n"])
-        if confirm:
+            console.print("Paste text here and press Enter:")
+            current_paste = (await get_channel().readline(), None)
+        # the preview only renders a few lines at each end, big clipboards don't flood the terminal
+        plain = current_paste[0] if current_paste and current_paste[0] else ""
+        console.print(render_preview(plain, current_paste[1], config))
+        if await ask_confirm("Do you wish to continue with this capture or re-capture?", default=True):
             break
 
     return current_paste
 
 
-async def wait_for_navigate():
+async def wait_for_navigate(tracker=None, channel=None):
+    """Waits until the user clicks into an input (with a tracker.PageTracker) or presses Enter.
+
+    channel is where Enter is read from, the running loop's stdin channel by default.
+    """
+    channel = channel or get_channel()
     console.print("[bold]Now navigate to the page you want to use, in the Playwright browser.[/bold]")
-    console.print("[dim]Click into the input where you want the text to appear, then return here.[/dim]")
-    with console.status("[bold] Waiting for navigation and focus... [/bold] [dim]Press Enter to start typing.[/dim]",
+    if tracker is None:
+        console.print("[dim]Click into the input where you want the text to appear, then return here.[/dim]")
+        with console.status("[bold] Waiting for navigation and focus... [/bold] [dim]Press Enter to start typing.[/dim]",
+                            spinner="simpleDotsScrolling"):
+            await channel.readline(hidden=True)
+        return
+
+    console.print("[dim]Click into the input where you want the text to appear, typing starts right away.[/dim]")
+    with console.status("[bold] Waiting for focus... [/bold] [dim]Or press Enter here to type into the current focus.[/dim]",
                         spinner="simpleDotsScrolling"):
-        await asyncio.to_thread(Prompt.ask, "", password=True)  # hack for entering
+        line = asyncio.ensure_future(channel.readline(hidden=True))
+        focus = asyncio.ensure_future(tracker.wait_for_editable())
+        await asyncio.wait((line, focus), return_when=asyncio.FIRST_COMPLETED)
+        if line.done() and line.exception() is not None:
+            await focus  # stdin is closed, only a click can start us
+        for task in (line, focus):
+            task.cancel()
 
 
 async def wait_till_exit():
     with console.status(
             "[bold] The script will continue to run to ensure the browser doesn't close. To start a new job, press Enter. To exit, press CTRL-C.[/bold]",
             spinner="hamburger"):
-        Prompt.ask(password=True)
+        await get_channel().readline(hidden=True)
 
 
-async def listen_for_pause(algo):
-    try:
-        await asyncio.to_thread(input)
-        algo.request_pause()
-    except (EOFError, KeyboardInterrupt, asyncio.CancelledError):
-        pass
+async def ask_confirm(prompt: str, default: bool = True) -> bool:
+    """Confirm.ask that reads through the stdin channel instead of blocking the loop."""
+    confirm = Confirm(prompt, choices=["y", "n"])
+    while True:
+        console.print(confirm.make_prompt(default), end="")
+        answer = (await get_channel().readline()).strip().lower()
+        if not answer:
+            return default
+        if answer in ("y", "n"):
+            return answer == "y"
+        console.print(Confirm.validate_error_message)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .algorithm import Algorithm, Config
+from .config import console
+from .keyboard import open_keyboard
+from .trace import Tracer
+
+
+@dataclass
+class Job:
+    """One text to type. Runs in ``page`` if given, otherwise in a new tab opened at ``url``."""
+    text: str
+    page: object = None
+    url: Optional[str] = None
+    selector: Optional[str] = None  # element to click into before typing
+    config: Optional[Config] = None
+    # set while the job runs
+    algo: Optional[Algorithm] = field(default=None, repr=False)
+    done: Optional[asyncio.Future] = field(default=None, repr=False)
+
+
+class JobQueue:
+    """Types several jobs at once into pages of one Playwrighter browser context.
+
+    Up to ``concurrency`` jobs run at the same time, each with its own Algorithm.
+    Jobs that target the same page run one after another.
+    Typing is non-interactive: no stdin pause listener and no progress rendering.
+    """
+
+    def __init__(self, pw, concurrency: int = 4, config: Optional[Config] = None, trace_dir: Optional[str] = None,
+                 keyboard: str = "playwright"):
+        self.pw = pw
+        self.concurrency = max(1, concurrency)
+        self.config = config
+        self.trace_dir = trace_dir  # when set, every job writes a timing trace here
+        self.keyboard = keyboard  # keyboard.py backend name
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._page_locks = weakref.WeakKeyDictionary()
+
+    def submit(self, job: Job) -> Job:
+        job.done = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(job)
+        if not self._workers:
+            self.start()
+        return job
+
+    def start(self):
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def join(self):
+        """Waits until every submitted job has finished."""
+        await self._queue.join()
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+                if not job.done.done():
+                    job.done.set_result(job)
+            except asyncio.CancelledError:
+                job.done.cancel()
+                raise
+            except Exception as e:
+                console.print(f"[red]Job failed: {e}[/red]")
+                if not job.done.done():
+                    job.done.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        page = job.page or await self.pw.new_page(job.url)
+        job.page = page
+        lock = self._page_locks.setdefault(page, asyncio.Lock())
+        async with lock:
+            if job.selector:
+                await page.click(job.selector)
+            tracer = Tracer() if self.trace_dir else None
+            keyboard = await open_keyboard(self.pw.browser, page, self.keyboard)
+            try:
+                job.algo = Algorithm(page, job.config or self.config, quiet=True, interactive=False, tracer=tracer,
+                                     keyboard=keyboard)
+                await job.algo.type_text(job.text)
+            finally:
+                await keyboard.close()
+            if tracer:
+                tracer.write(self.trace_dir, f"job-{id(job):x}-{time.strftime('%Y%m%d-%H%M%S')}")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Keyboard backends the engine types through.
+
+Every backend has the same coroutines: ``insert_text(text)``, ``press(key)``,
+``backspace(count)``, ``flush()`` and ``close()``. ``flush`` waits until everything sent
+so far has reached the page and must be awaited before reading the page back.
+
+* ``PlaywrightKeyboard`` wraps ``page.keyboard`` (the default).
+* ``CDPKeyboard`` sends ``Input.insertText``/``Input.dispatchKeyEvent`` over a raw
+  ``CDPSession`` and keeps up to ``max_in_flight`` commands in flight instead of waiting
+  for each reply. Chromium handles input commands in the order they were sent.
+* ``MemoryKeyboard`` edits an in-memory buffer, for benchmarks and tests.
+"""
+import asyncio
+from collections import deque
+from typing import Deque, List
+
+BACKENDS = ("playwright", "cdp")
+
+MODIFIERS = {"Alt": 1, "Control": 2, "Meta": 4, "Shift": 8}
+# key -> (code, windows virtual key code, text typed by the key)
+KEYS = {
+    "Enter": ("Enter", 13, "\r"),
+    "Backspace": ("Backspace", 8, ""),
+    "Tab": ("Tab", 9, "\t"),
+    "Escape": ("Escape", 27, ""),
+    "Delete": ("Delete", 46, ""),
+    "Home": ("Home", 36, ""),
+    "End": ("End", 35, ""),
+    "ArrowLeft": ("ArrowLeft", 37, ""),
+    "ArrowUp": ("ArrowUp", 38, ""),
+    "ArrowRight": ("ArrowRight", 39, ""),
+    "ArrowDown": ("ArrowDown", 40, ""),
+}
+
+
+def key_events(key: str) -> List[dict]:
+    """``Input.dispatchKeyEvent`` params for pressing key, in Playwright's ``press`` syntax ("Control+b")."""
+    *held, key = key.split("+") if key != "+" else [key]
+    modifiers = 0
+    for name in held:
+        if name not in MODIFIERS:
+            raise ValueError(f"Unknown modifier {name!r}")
+        modifiers |= MODIFIERS[name]
+    if key in KEYS:
+        code, key_code, text = KEYS[key]
+    elif len(key) == 1:
+        upper = key.upper()
+        code = f"Key{upper}" if upper.isalpha() and upper.isascii() else f"Digit{key}" if key.isdigit() else ""
+        key_code = ord(upper) if upper.isascii() and upper.isalnum() else 0
+        text = key
+    else:
+        raise ValueError(f"Unknown key {key!r}")
+    if modifiers & ~MODIFIERS["Shift"]:
+        text = ""  # shortcuts don't type anything
+    down = {"type": "keyDown" if text else "rawKeyDown", "modifiers": modifiers, "key": key, "code": code,
+            "windowsVirtualKeyCode": key_code}
+    if text:
+        down["text"] = down["unmodifiedText"] = text
+    up = {"type": "keyUp", "modifiers": modifiers, "key": key, "code": code, "windowsVirtualKeyCode": key_code}
+    return [down, up]
+
+
+class PlaywrightKeyboard:
+    """Playwright's ``page.keyboard``, or anything else with ``insert_text`` and ``press``."""
+    __slots__ = ("keyboard",)
+
+    def __init__(self, keyboard):
+        self.keyboard = keyboard
+
+    async def insert_text(self, text: str):
+        await self.keyboard.insert_text(text)
+
+    async def press(self, key: str):
+        await self.keyboard.press(key)
+
+    async def backspace(self, count: int = 1):
+        for _ in range(count):
+            await self.keyboard.press("Backspace")
+
+    async def flush(self):
+        pass  # every call already waited for its reply
+
+    async def close(self):
+        pass
+
+
+class CDPKeyboard:
+    """Sends input straight over a ``CDPSession`` with up to max_in_flight unanswered commands.
+
+    A failed command is raised from the next call (or from ``flush``). With
+    ``max_in_flight=1`` every command waits for the previous reply, like Playwright does.
+    """
+
+    def __init__(self, session, max_in_flight: int = 64):
+        self.session = session
+        self.max_in_flight = max(1, max_in_flight)
+        self._in_flight: Deque[asyncio.Future] = deque()
+
+    async def _send(self, method: str, params: dict):
+        in_flight = self._in_flight
+        while in_flight and in_flight[0].done():
+            in_flight.popleft().result()
+        if len(in_flight) >= self.max_in_flight:
+            await in_flight.popleft()
+        in_flight.append(asyncio.ensure_future(self.session.send(method, params)))
+
+    async def insert_text(self, text: str):
+        await self._send("Input.insertText", {"text": text})
+
+    async def press(self, key: str):
+        for params in key_events(key):
+            await self._send("Input.dispatchKeyEvent", params)
+
+    async def backspace(self, count: int = 1):
+        down, up = key_events("Backspace")
+        for _ in range(count):
+            await self._send("Input.dispatchKeyEvent", down)
+            await self._send("Input.dispatchKeyEvent", up)
+
+    async def flush(self):
+        while self._in_flight:
+            await self._in_flight.popleft()
+
+    async def close(self):
+        try:
+            await self.flush()
+        finally:
+            for future in self._in_flight:
+                future.cancel()
+            self._in_flight.clear()
+            await self.session.detach()
+
+
+class MemoryKeyboard:
+    """Keeps what an editor with the caret at the end would contain."""
+    __slots__ = ("buffer", "calls")
+
+    def __init__(self):
+        self.buffer: List[str] = []
+        self.calls = 0
+
+    async def insert_text(self, text: str):
+        self.calls += 1
+        self.buffer.append(text)
+
+    async def press(self, key: str):
+        self.calls += 1
+        if key == "Enter":
+            self.buffer.append("\n")
+        elif key == "Backspace":
+            self._delete(1)
+
+    async def backspace(self, count: int = 1):
+        self.calls += count
+        self._delete(count)
+
+    def _delete(self, count: int):
+        buffer = self.buffer
+        while count and buffer:
+            last = buffer.pop()
+            if len(last) > count:
+                buffer.append(last[:-count])
+                return
+            count -= len(last)
+
+    async def flush(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def text(self) -> str:
+        return "".join(self.buffer)
+
+
+async def open_keyboard(context, page, backend: str = "playwright"):
+    """The keyboard backend for page. CDP sessions have to be closed with ``close()``."""
+    if backend == "cdp":
+        return CDPKeyboard(await context.new_cdp_session(page))
+    if backend != "playwright":
+        raise ValueError(f"Unknown keyboard backend {backend!r}")
+    return PlaywrightKeyboard(page.keyboard)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Keyboard layouts for typo generation, compiled once into immutable neighbor tables.
+
+A layout file (``layouts/<name>.json``) maps every key to a string of the keys around
+it. ``load_layout`` compiles it into a ``Layout`` and caches it, so every Algorithm and
+plan of a session shares one instance. Lookups return prebuilt tuples for the char's
+case. Chars the layout doesn't have fall back to any other ASCII letter; those tuples
+are prebuilt too, so picking a typo never allocates and the shared Layout never changes.
+"""
+import functools
+import json
+import pathlib
+import string
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
+
+LAYOUT_DIR = pathlib.Path(__file__).parent / "layouts"
+DEFAULT_LAYOUT = "qwerty"
+
+
+class Layout:
+    __slots__ = ("name", "table", "_upper", "_others", "_others_upper", "_any", "_any_upper")
+
+    def __init__(self, name: str, neighbors: Mapping[str, str]):
+        self.name = name
+        table: Dict[str, Tuple[str, ...]] = {}
+        for key, around in neighbors.items():
+            table[key] = tuple(around)
+            upper = key.upper()
+            if upper != key and upper.lower() == key:
+                table[upper] = tuple(n.upper() for n in around)
+        self.table: Mapping[str, Tuple[str, ...]] = MappingProxyType(table)  # char -> typo candidates
+        # fallbacks, by the char's lowercase form: the table's candidates in uppercase, for
+        # uppercase forms the table doesn't list (e.g. the Kelvin sign), or every other letter
+        self._upper = MappingProxyType({key: tuple(n.upper() for n in around) for key, around in table.items()})
+        letters = string.ascii_lowercase
+        self._others = MappingProxyType({low: tuple(c for c in letters if c != low) for low in letters})
+        self._others_upper = MappingProxyType({low: tuple(c.upper() for c in around)
+                                               for low, around in self._others.items()})
+        self._any = tuple(letters)
+        self._any_upper = tuple(letters.upper())
+
+    def neighbors(self, char: str) -> Tuple[str, ...]:
+        """Keys a finger could hit instead of char, in char's case."""
+        candidates = self.table.get(char)
+        if candidates is not None:
+            return candidates
+        low = char.lower()
+        if char.isupper():
+            return self._upper.get(low) or self._others_upper.get(low, self._any_upper)
+        return self.table.get(low) or self._others.get(low, self._any)
+
+
+def load_layout(name: str = DEFAULT_LAYOUT) -> Layout:
+    """The layout called name from ``layouts/``, or from a JSON file when name is a path."""
+    return _load(name)
+
+
+@functools.lru_cache(maxsize=None)
+def _load(name: str) -> Layout:
+    path = pathlib.Path(name) if name.endswith(".json") else LAYOUT_DIR / f"{name}.json"
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        known = ", ".join(sorted(p.stem for p in LAYOUT_DIR.glob("*.json")))
+        raise ValueError(f"Unknown keyboard layout {name!r} (available: {known})") from None
+    except OSError as e:
+        raise ValueError(f"Can't read keyboard layout {name!r}: {e}") from None
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Layout {name!r} is not valid JSON: {e}") from None
+    neighbors = data.get("neighbors") if isinstance(data, dict) else None
+    if not isinstance(neighbors, dict):
+        raise ValueError(f"Layout {name!r} needs a \"neighbors\" object mapping keys to their neighbors")
+    if not all(isinstance(around, str) and around for around in neighbors.values()):
+        raise ValueError(f"Layout {name!r}: every key needs a non-empty string of neighbors")
+    return Layout(data.get("name", path.stem), neighbors)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Plan-then-execute typing.
+
+Instead of drawing delays and typos one character at a time inside the keystroke loop,
+a ``TypingPlan`` computes all of them for a whole text up front. Executing a plan is
+then only a walk over compact arrays (see ``Algorithm._run_plan``).
+"""
+import asyncio
+import math
+import random
+import re
+from array import array
+from dataclasses import dataclass
+from typing import Optional
+
+from .algorithm import Config, fatigue_multiplier
+from .layout import load_layout
+
+_PAUSE_CHARS = re.compile(r"[.?!,;:\n]")
+_SPACES = re.compile(" ")
+
+
+@dataclass
+class TypingPlan:
+    text: str  # the text to type, without carriage returns
+    delays: array  # delay after each character, fatigue already applied
+    # one entry per typo event, sorted by index
+    typo_index: array
+    typo_chars: str
+    typo_steps: array  # correct characters typed after the typo before backtracking
+    typo_pauses: array  # short pause used while correcting
+
+    @classmethod
+    def build(cls, text: str, config: Optional[Config] = None, rng: Optional[random.Random] = None,
+              offset: int = 0) -> "TypingPlan":
+        """``offset`` is the number of chars typed before text, so fatigue carries over between chunks
+        and only the first 3 chars of the whole input are kept free of typos, as in ``Typo``."""
+        config = config or Config()
+        rng = rng or random.Random(config.seed)
+        text = text.replace("\r", "")
+        n = len(text)
+
+        # fatigue multiplier per interval of characters
+        if config.enable_fatigue:
+            interval = config.fatigue_interval
+            first, shift = divmod(offset, interval)
+            blocks = (n + shift) // interval + 1
+            mult = [fatigue_multiplier(first + level, config.fatigue_scale, config.max_fatigue)
+                    for level in range(blocks)]
+        else:
+            mult = [1.0]
+            interval, shift = n + 1, 0
+
+        rand = rng.random
+        if config.enable_jitter:
+            low, span = config.min_delay, config.max_delay - config.min_delay
+            delays = array('d', [(low + span * rand()) * mult[(i + shift) // interval] for i in range(n)])
+            pause_low, pause_high = config.punctuation_pause
+            pause_span = pause_high - pause_low
+            for match in _PAUSE_CHARS.finditer(text):
+                i = match.start()
+                delays[i] += (pause_low + pause_span * rand()) * mult[(i + shift) // interval]
+            for match in _SPACES.finditer(text):
+                i = match.start()
+                delays[i] += 0.08 * rand() * mult[(i + shift) // interval]
+        else:
+            delays = array('d', [config.min_delay * mult[(i + shift) // interval] for i in range(n)])
+
+        typo_index, typo_chars = array('q'), []
+        typo_steps, typo_pauses = array('H'), array('d')
+        chance = config.backtrack_chance
+        if config.enable_typos and 0 < chance:
+            # Rather than rolling for every character, jump straight to the next success
+            # (geometric gaps). Typos can't start while one is waiting to be corrected.
+            log_miss = math.log1p(-chance) if chance < 1 else -math.inf
+            neighbors = load_layout(config.layout).neighbors
+            choice = rng.choice
+            i = max(3 - offset, 0)
+            while True:
+                i += int(math.log(1.0 - rand()) / log_miss)
+                if i >= n:
+                    break
+                char = text[i]
+                if char.isspace():
+                    i += 1
+                    continue
+                steps = rng.randint(*config.steps_till_backtrack)
+                typo_index.append(i)
+                typo_chars.append(choice(neighbors(char)))
+                typo_steps.append(steps)
+                typo_pauses.append(rng.uniform(config.min_delay * 0.5, config.max_delay * 1.5))
+                i += steps + 1
+
+        return cls(text, delays, typo_index, "".join(typo_chars), typo_steps, typo_pauses)
+
+    @classmethod
+    async def build_async(cls, text: str, config: Optional[Config] = None,
+                          rng: Optional[random.Random] = None) -> "TypingPlan":
+        """Builds a plan off the event loop, e.g. for the next document while one is typing."""
+        return await asyncio.to_thread(cls.build, text, config, rng)
+
+    def __len__(self):
+        return len(self.text)
+
+    @property
+    def duration(self) -> float:
+        """Seconds of configured delay, excluding correction backspaces."""
+        return math.fsum(self.delays)
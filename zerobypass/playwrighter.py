@@ -1,28 +1,94 @@
 #!/usr/bin/env python3
 import asyncio
+import contextlib
+import importlib.metadata
+import json
+import os
 import pathlib
 import subprocess
 import sys
-from typing import Optional
+import time
+import weakref
+from collections import deque
+from typing import Deque, Optional, Sequence, Tuple
 
 from playwright.async_api import async_playwright, Error, Playwright, BrowserContext
 from rich.panel import Panel
 
-from .config import console, args
+from .config import console
+from .tracker import PageTracker
+
+
+# Chromium switches for --lean: no background services, extensions, GPU process or
+# crash reporting, fewer renderer processes and a small disk cache. --disable-features
+# is left out on purpose, a second copy would replace the list Playwright passes itself.
+LEAN_ARGS = (
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-extensions",
+    "--disable-sync",
+    "--disable-breakpad",
+    "--disable-client-side-phishing-detection",
+    "--disable-domain-reliability",
+    "--disable-hang-monitor",
+    "--disable-gpu",
+    "--disable-gpu-compositing",
+    "--metrics-recording-only",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--renderer-process-limit=2",
+    "--disk-cache-size=33554432",
+)
+MEMORY_SAMPLES = 360  # how many memory samples are kept
+
+
+def _install_stamp_path() -> pathlib.Path:
+    cache = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(cache) / "zerobypass" / "playwright-install.json"
+
+
+def _install_key() -> dict:
+    """What a successful install depends on: the Playwright version and its browser revisions."""
+    import playwright
+
+    browsers = pathlib.Path(playwright.__file__).parent / "driver" / "package" / "browsers.json"
+    try:
+        revisions = {b["name"]: b["revision"] for b in json.loads(browsers.read_text())["browsers"]}
+    except (OSError, ValueError, KeyError):
+        revisions = None
+    return {"playwright": importlib.metadata.version("playwright"), "browsers": revisions}
 
 
 class Playwrighter:
-    def __init__(self):
+    def __init__(self, data_dir: Optional[str] = None, lean: bool = False, block_resources: Sequence[str] = (),
+                 memory_interval: Optional[float] = None):
+        self.data_dir = data_dir
+        self.lean = lean  # launch with LEAN_ARGS
+        self.block_resources = frozenset(block_resources)  # request resource types to abort
+        self.memory_interval = memory_interval  # seconds between memory samples, None to not sample
+        # (time, JS heap used in bytes, DOM nodes) summed over all open tabs
+        self.memory_samples: Deque[Tuple[float, int, int]] = deque(maxlen=MEMORY_SAMPLES)
         self.playwright: Optional[Playwright] = None
         self.browser: Optional[BrowserContext] = None
+        self.tracker: Optional[PageTracker] = None
         self._page_exists_lock = asyncio.Lock()
+        self._cdp_sessions = weakref.WeakKeyDictionary()
+        self._memory_task: Optional[asyncio.Task] = None
+
+    async def start(self, quiet: bool = False):
+        """Installs (if needed) and launches the browser.
 
-    async def start(self):
-        await self._check_for_install()
+        With quiet=True no spinners are shown, so it can run in the background while
+        another prompt owns the terminal.
+        """
+        await self._check_for_install(quiet)
         try:
-            with console.status("[bold blue]Launching Playwright browser...", spinner="earth"):
-                if args.browser_data_dir:
-                    data_dir = args.browser_data_dir
+            status = contextlib.nullcontext() if quiet else console.status(
+                "[bold blue]Launching Playwright browser...", spinner="earth")
+            with status:
+                if self.data_dir:
+                    data_dir = self.data_dir
                 else:
                     data_dir = str(pathlib.Path.home() / ("." + pathlib.Path(__file__).parent.name))
 
@@ -31,16 +97,25 @@ class Playwrighter:
                     user_data_dir=data_dir,
                     headless=False,
                     channel='chrome',
-                    args=['--disable-blink-features=AutomationControlled']
+                    args=['--disable-blink-features=AutomationControlled', *(LEAN_ARGS if self.lean else ())]
                 )
                 await self.browser.grant_permissions(["clipboard-read", "clipboard-write"])
+                if self.block_resources:
+                    await self.browser.route("**/*", self._route_request)
+                if self.memory_interval:
+                    self._memory_task = asyncio.create_task(self._sample_memory())
                 # TODO fix: the handler doesnt work
                 self.browser.on("close", self._user_closed_handler)
                 await self._ensure_page_exists()
+                tracker = PageTracker()
+                await tracker.attach(self.browser)
+                self.tracker = tracker
                 # Keep Playwright alive until close() is called.
             console.print("[bold]✔ Playwright browser launched successfully[/bold]")
         except Exception as e:
             console.print(f"[red]Error initializing Playwright: {e}[/red]")
+            # the install may be what's broken, verify it again next time
+            _install_stamp_path().unlink(missing_ok=True)
             await self.close()
             asyncio.get_event_loop().stop()
 
@@ -49,20 +124,70 @@ class Playwrighter:
         await page.goto(url)
         return page
 
+    async def new_page(self, url: Optional[str] = None):
+        """Opens a new tab in the shared context, optionally navigating it."""
+        page = await self.browser.new_page()
+        if url:
+            await page.goto(url)
+        return page
+
     async def close(self):
+        if self._memory_task:
+            self._memory_task.cancel()
+            self._memory_task = None
         if self.browser:
             await self.browser.close()
         if self.playwright:
             await self.playwright.stop()
 
+    async def _route_request(self, route):
+        if route.request.resource_type in self.block_resources:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def memory_usage(self) -> Tuple[int, int]:
+        """JS heap used (bytes) and DOM nodes, summed over the open tabs, from CDP Performance.getMetrics."""
+        heap = nodes = 0
+        for page in list(self.browser.pages):
+            try:
+                session = self._cdp_sessions.get(page)
+                if session is None:
+                    session = self._cdp_sessions[page] = await self.browser.new_cdp_session(page)
+                    await session.send("Performance.enable")
+                metrics = {m["name"]: m["value"] for m in (await session.send("Performance.getMetrics"))["metrics"]}
+            except Error:
+                continue  # closed while sampling
+            heap += int(metrics.get("JSHeapUsedSize", 0))
+            nodes += int(metrics.get("Nodes", 0))
+        return heap, nodes
+
+    async def _sample_memory(self):
+        peak = 0
+        while True:
+            await asyncio.sleep(self.memory_interval)
+            if self.browser is None:
+                continue
+            heap, nodes = await self.memory_usage()
+            self.memory_samples.append((time.monotonic(), heap, nodes))
+            # only speak up when usage clearly grows
+            if heap > peak * 1.25 and heap > 64 * 1024 ** 2:
+                console.print(f"[dim]Browser memory: {heap / 1024 ** 2:.0f} MB JS heap, {nodes} DOM nodes "
+                              f"across {len(self.browser.pages)} tabs.[/dim]")
+            peak = max(peak, heap)
+
     async def _ensure_page_exists(self):
         if not self.browser.pages:
             await self.browser.new_page()
 
     async def get_current_page(self):
         """
-        Returns the most recent page so typing happens on the tab the user is viewing.
+        Returns the page the user is active in so typing happens on the tab they are viewing.
         """
+        page = self.tracker.page if self.tracker else None
+        if page is not None and not page.is_closed():
+            return page
+        # no tab has reported focus yet
         async with self._page_exists_lock:
             await self._ensure_page_exists()
 
@@ -81,13 +206,23 @@ class Playwrighter:
             return page
 
     @staticmethod
-    async def _check_for_install():
+    async def _check_for_install(quiet: bool = False):
+        stamp = _install_stamp_path()
+        key = _install_key()
+        try:
+            if json.loads(stamp.read_text()) == key:
+                return  # nothing changed since the last successful install
+        except (OSError, ValueError):
+            pass
+
         # Define the command
         cmd = [sys.executable, "-m", "playwright", "install", "--with-deps", "chrome"]
 
         try:
             # Start the status spinner
-            with console.status("[bold blue]Verifying Playwright browser install...", spinner="earth"):
+            status = contextlib.nullcontext() if quiet else console.status(
+                "[bold blue]Verifying Playwright browser install...", spinner="earth")
+            with status:
                 # Use asyncio.subprocess.PIPE for async processes
                 process = await asyncio.create_subprocess_exec(
                     *cmd,
@@ -105,9 +240,10 @@ class Playwrighter:
                 # If there's output, print the success message
                 if stdout.strip() or stderr.strip():
                     console.print("[bold green]✔ Playwright browsers installed successfully![/bold green]")
-                # Use asyncio.sleep instead of time.sleep
-                await asyncio.sleep(1)
-            console.clear()
+                stamp.parent.mkdir(parents=True, exist_ok=True)
+                stamp.write_text(json.dumps(key))
+            if not quiet:
+                console.clear()
         except subprocess.CalledProcessError:
             console.print(
                 Panel.fit(
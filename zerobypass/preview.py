@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Bounded preview of a captured text: head and tail excerpts, counts and a duration estimate."""
+import re
+from typing import Optional
+
+from rich.markup import escape
+from rich.panel import Panel
+
+from .algorithm import Config
+from .estimate import estimate_text, format_duration
+
+HEAD_LINES = 8
+TAIL_LINES = 4
+MAX_LINE = 160  # longer lines are cut in the preview
+_WORD = re.compile(r"\S+")
+
+
+def _clip(line: str) -> str:
+    return escape(line if len(line) <= MAX_LINE else line[:MAX_LINE] + "…")
+
+
+def render_preview(plain: str, html: Optional[str] = None, config: Optional[Config] = None) -> Panel:
+    """A panel whose size doesn't depend on the length of plain."""
+    plain = plain.replace("\r", "")
+    lines = plain.count("\n") + 1 if plain else 0
+    words = sum(1 for _ in _WORD.finditer(plain))
+
+    if lines <= HEAD_LINES + TAIL_LINES:
+        body = [_clip(line) for line in plain.split("\n")]
+    else:
+        # only look at a window at each end, lines past MAX_LINE are cut anyway
+        head = plain[:HEAD_LINES * (MAX_LINE + 1)].split("\n")
+        if len(head) <= HEAD_LINES:
+            head[-1] = head[-1][:MAX_LINE] + "…"  # the window ended inside this line
+        head = head[:HEAD_LINES]
+        tail = plain[-TAIL_LINES * (MAX_LINE + 1):].split("\n")
+        if len(tail) <= TAIL_LINES:
+            tail[0] = "…" + tail[0][-MAX_LINE:]
+        tail = tail[-TAIL_LINES:]
+        body = [_clip(line) for line in head]
+        body.append(f"[dim]… {lines - len(head) - len(tail):,} more lines …[/dim]")
+        body += [_clip(line) for line in tail]
+
+    stats = f"{len(plain):,} chars · {lines:,} lines · {words:,} words"
+    if html:
+        stats += f" · {len(html):,} chars of HTML"
+    estimate = estimate_text(plain, config or Config())
+    stats += f" · ~{format_duration(estimate.total)} to type"
+    if estimate.typos >= 1:
+        stats += f" with ~{estimate.typos:,.0f} typos"
+    return Panel("\n".join(body), title="Text Captured", subtitle=f"[dim]{stats}[/dim]", border_style="green")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+import asyncio
+from typing import Callable, Optional
+
+from .config import console
+from .estimate import class_counts, format_duration, mean_char_delay
+
+
+class ProgressRenderer:
+    """Shows typing progress from its own task, at most ``fps`` times a second.
+
+    The typing loop only bumps ``Modules.typed_count``; this task reads it, so
+    formatting and Rich rendering never happen between keystrokes.
+    ETA and chars/sec come from the Config timing model, not from measurement.
+
+    ``loop`` is the loop to render on when it isn't the running one (the UI loop when the
+    engine runs on ``engine.EngineThread``); the task there only reads the counters.
+
+    For streamed input ``position`` returns the byte offset typed so far and ``total``
+    is in bytes (or None if unknown); ``text`` is then only a sample for the timing model.
+    """
+
+    def __init__(self, mod, text: str, total: Optional[int] = None, fps: float = 10.0, quiet: bool = False,
+                 position: Optional[Callable[[], int]] = None, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.mod = mod
+        self.position = position
+        self.total = total if total is not None or position else len(text)
+        self.interval = 1 / fps
+        self.quiet = quiet
+        self.loop = loop
+        chars, pauses, spaces = class_counts(text)
+        chars = max(chars, 1)
+        self.char_delay = mean_char_delay(mod.config, pauses / chars, spaces / chars)
+        # ETA for byte totals assumes the rest of the input has the sample's bytes per char
+        self.units_per_char = len(text.encode("utf-8", "surrogatepass")) / chars if position else 1.0
+        self._status = None
+        self._task = None  # asyncio.Task, or a concurrent.futures.Future when rendering on another loop
+
+    def render(self) -> str:
+        typed = self.position() if self.position else self.mod.typed_count
+        if self.total is None:
+            return (f"[bold blue]Currently typing, {typed / 1024:.0f} KiB done.[/bold blue]"
+                    " [dim]Press enter to pause.[/dim]")
+        percent = typed / self.total * 100 if self.total else 100.0
+        msg = f"[bold blue]Currently typing, progress: {percent:.2f}%.[/bold blue]"
+        if self.char_delay > 0:
+            units_per_char = self.units_per_char
+            if self.position and self.mod.typed_count and typed:
+                units_per_char = typed / self.mod.typed_count  # what the input so far actually had
+            remaining = (self.total - typed) / units_per_char
+            eta = remaining * self.char_delay * self.mod.timer.get_fatigue_multiplier()
+            msg += f" [dim]{1 / self.char_delay:.1f} chars/s, ETA {format_duration(eta)}.[/dim]"
+        return msg + " [dim]Press enter to pause.[/dim]"
+
+    def start(self):
+        if self.quiet:
+            return
+        if self._status is None:
+            self._status = console.status(self.render(), spinner="bouncingBall")
+        self._status.start()
+        if self.loop is None or self.loop is asyncio.get_running_loop():
+            self._task = asyncio.create_task(self._run())
+        else:
+            self._task = asyncio.run_coroutine_threadsafe(self._run(), self.loop)
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._status:
+            self._status.stop()
+
+    async def _run(self):
+        while True:
+            self._status.update(self.render())
+            await asyncio.sleep(self.interval)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Checks what ended up in the target after typing and fixes only the parts that differ."""
+from array import array
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .target import common_prefix_length, common_suffix_length, read_target_text, select_range, utf16_offsets
+
+# Myers' diff costs O((N+M)·D) time and O(D²) memory for D differing chars. Past this many
+# differences the whole differing region is replaced instead.
+MAX_DIFF_EDITS = 1000
+# Typing loses a few keystrokes, it doesn't rewrite the document. A diff that changes more
+# than this share of the source (at least MIN_REPAIR_LIMIT chars) is reported, not repaired.
+MAX_REPAIR_RATIO = 0.05
+MIN_REPAIR_LIMIT = 16
+
+Edit = Tuple[int, int, str]  # replace current[start:end] with the string
+
+
+@dataclass
+class RepairResult:
+    verified: bool = False  # the target matched the source at the end
+    readable: bool = True  # False when the target's text couldn't be read back
+    unsafe: bool = False  # the target differed too much to repair, see repair_is_safe
+    differing: int = 0  # chars a full repair would change, when unsafe
+    edits: int = 0
+    deleted: int = 0
+    inserted: int = 0
+
+    @property
+    def repaired(self) -> int:
+        return self.deleted + self.inserted
+
+
+def _snake(a: str, b: str, x: int, y: int) -> Tuple[int, int]:
+    """Follows equal chars from (x, y), galloping over long equal runs with slice compares."""
+    n, m = len(a), len(b)
+    step = 8
+    while step:
+        if x + step <= n and y + step <= m and a[x:x + step] == b[y:y + step]:
+            x += step
+            y += step
+            step *= 2
+        else:
+            step //= 2
+    return x, y
+
+
+def _myers(a: str, b: str, max_d: int) -> Optional[List[Edit]]:
+    n, m = len(a), len(b)
+    offset = max_d + 1
+    v = array('q', [0]) * (2 * max_d + 3)
+    trace = []
+    for d in range(max_d + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]  # down: insert b[y]
+            else:
+                x = v[offset + k - 1] + 1  # right: delete a[x]
+            x, y = _snake(a, b, x, x - k)
+            v[offset + k] = x
+            if x >= n and y >= m:
+                trace.append(v[offset - d:offset + d + 1])
+                return _backtrack(b, trace, n, m)
+        trace.append(v[offset - d:offset + d + 1])
+    return None
+
+
+def _backtrack(b: str, trace, x: int, y: int) -> List[Edit]:
+    ops = []  # (position in a, deleted chars, inserted text), back to front
+    for d in range(len(trace) - 1, 0, -1):
+        prev = trace[d - 1]  # k = -(d - 1) is at index 0
+        k = x - y
+        if k == -d or (k != d and prev[k - 1 + d - 1] < prev[k + 1 + d - 1]):
+            prev_k = k + 1
+            prev_x = prev[prev_k + d - 1]
+            ops.append((prev_x, 0, b[prev_x - prev_k]))
+        else:
+            prev_k = k - 1
+            prev_x = prev[prev_k + d - 1]
+            ops.append((prev_x, 1, ""))
+        x, y = prev_x, prev_x - prev_k
+
+    edits: List[list] = []
+    for pos, deleted, text in reversed(ops):
+        if edits and edits[-1][1] == pos:
+            edits[-1][1] += deleted
+            edits[-1][2] += text
+        else:
+            edits.append([pos, pos + deleted, text])
+    return [tuple(edit) for edit in edits]
+
+
+def diff_edits(current: str, source: str, max_edits: int = MAX_DIFF_EDITS) -> List[Edit]:
+    """Edits that turn current into source, in ascending order and not overlapping."""
+    prefix = common_prefix_length(current, source)
+    suffix = common_suffix_length(current[prefix:], source[prefix:])
+    a = current[prefix:len(current) - suffix]
+    b = source[prefix:len(source) - suffix]
+    if not a and not b:
+        return []
+    edits = _myers(a, b, max_edits)
+    if edits is None:
+        return [(prefix, prefix + len(a), b)]
+    return [(prefix + start, prefix + end, text) for start, end, text in edits]
+
+
+def edit_size(edits: List[Edit]) -> int:
+    return sum(end - start + len(text) for start, end, text in edits)
+
+
+def repair_is_safe(current: str, source: str, edits: List[Edit], repaired: int = 0) -> bool:
+    """Whether edits look like fixing dropped keystrokes rather than overwriting another element.
+
+    A target sharing neither a prefix nor a suffix with the source is most likely not the
+    element we typed into (focus slipped, or a hidden proxy that reads back empty), and a
+    repair of more than MAX_REPAIR_RATIO of the source, repaired chars included, would
+    replace more than typing can have lost.
+    """
+    if not common_prefix_length(current, source) and not common_suffix_length(current, source):
+        return False
+    return repaired + edit_size(edits) <= max(MIN_REPAIR_LIMIT, len(source) * MAX_REPAIR_RATIO)
+
+
+async def apply_edits(page, keyboard, edits: List[Edit], current: str) -> bool:
+    """Applies edits to current, the target's text, back to front so earlier offsets stay valid.
+
+    False if the target can't be selected.
+    """
+    # the DOM counts UTF-16 code units, an emoji before an edit shifts it by one
+    offsets = utf16_offsets(current, (offset for start, end, _ in edits for offset in (start, end)))
+    for i in range(len(edits) - 1, -1, -1):
+        start, end, text = edits[i]
+        await keyboard.flush()  # the previous edit has to land before selecting
+        if not await select_range(page, offsets[2 * i], offsets[2 * i + 1]):
+            return False
+        if end > start:
+            await keyboard.backspace()
+        for n, line in enumerate(text.split("\n")):
+            if n:
+                await keyboard.press("Enter")
+            if line:
+                await keyboard.insert_text(line)
+    return True
+
+
+async def verify_and_repair(page, keyboard, source: str, max_rounds: int = 2) -> RepairResult:
+    """Reads the target back, fixes the differing ranges and checks again. keyboard is a keyboard.py backend."""
+    result = RepairResult()
+    source = source.replace("\u00a0", " ")  # read_target_text normalizes these too
+    for round_no in range(max_rounds + 1):
+        await keyboard.flush()
+        current = await read_target_text(page)
+        if current is None:
+            result.readable = False
+            return result
+        edits = diff_edits(current, source)
+        if not edits:
+            result.verified = True
+            return result
+        if not repair_is_safe(current, source, edits, result.repaired):
+            result.unsafe = True
+            result.differing = edit_size(edits)
+            return result
+        if round_no == max_rounds or not await apply_edits(page, keyboard, edits, current):
+            return result
+        result.edits += len(edits)
+        result.deleted += sum(end - start for start, end, _ in edits)
+        result.inserted += sum(len(text) for _, _, text in edits)
+    return result
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""Compiles the clipboard's HTML into text runs and formatting commands, incrementally.
+
+``RichTextCompiler`` is an ``html.parser.HTMLParser`` that keeps only a stack of open
+elements and the current formatting, never a DOM. Every ``feed()`` turns the markup seen
+so far into ops:
+
+    (TEXT, "some text")   text with HTML whitespace rules applied
+    (FORMAT, "bold")      toggle bold/italic/underline before the next text
+
+Formatting comes from tags (``b``, ``strong``, ``i``, ``em``, ``u``, ...) and inline
+styles (``font-weight``, ``font-style``, ``text-decoration``), which is how Google Docs
+and Word mark it. Toggles are only emitted right before text that needs them, so empty
+or redundant elements cost nothing.
+
+``RichTextSource`` runs the compiler ahead of the typing loop in bounded slices and
+yields the same ``(start, end, text)`` chunks as ``source.TextSource``, with
+``FormatCommand``s in between for ``Algorithm.type_stream``.
+"""
+import asyncio
+import re
+import sys
+from html.parser import HTMLParser
+from typing import AsyncIterator, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+TEXT, FORMAT = 0, 1
+STYLES = ("bold", "italic", "underline")
+SLICE_SIZE = 2048  # HTML chars parsed per step, a couple of ms of html.parser
+MAX_RUN = 4096  # text between formatting changes is handed out in chunks of at most this many chars
+MAX_AHEAD = 256  # chunks the parser may be ahead of the typing loop
+
+TAG_STYLES = {"b": "bold", "strong": "bold", "i": "italic", "em": "italic", "cite": "italic", "u": "underline",
+              "ins": "underline"}
+BLOCK_TAGS = frozenset(("p", "div", "h1", "h2", "h3", "h4", "h5", "h6", "li", "ul", "ol", "dl", "dt", "dd",
+                        "tr", "table", "blockquote", "pre", "section", "article", "header", "footer", "hr"))
+SKIP_TAGS = frozenset(("script", "style", "head", "title", "template", "noscript"))
+VOID_TAGS = frozenset(("br", "hr", "img", "meta", "link", "input", "col", "wbr", "area", "base", "source"))
+_SPACE = re.compile(r"[ \t\n\r\f]+")
+_DECLARATION = re.compile(r"\s*([a-z-]+)\s*:\s*([^;]+)")
+
+Op = Tuple[int, str]
+
+
+def _style_changes(style: str) -> Dict[str, bool]:
+    """Formatting an inline style attribute turns on or off."""
+    changes = {}
+    for name, value in _DECLARATION.findall(style.lower()):
+        value = value.strip()
+        if name == "font-weight":
+            changes["bold"] = value in ("bold", "bolder") or (value.isdigit() and int(value) >= 600)
+        elif name == "font-style":
+            changes["italic"] = value in ("italic", "oblique")
+        elif name in ("text-decoration", "text-decoration-line"):
+            changes["underline"] = "underline" in value
+    return changes
+
+
+class RichTextCompiler(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.ops: List[Op] = []  # compiled since the last take()
+        self._stack: List[Tuple[str, FrozenSet[str]]] = []  # open elements and the formatting inside them
+        self._formats: FrozenSet[str] = frozenset()
+        self._typed_formats: FrozenSet[str] = frozenset()  # formatting the editor has on
+        self._skip = 0  # depth inside SKIP_TAGS
+        self._pre = 0  # depth inside <pre>
+        self._breaks = 0  # newlines owed before the next text
+        self._space = False  # a collapsed space is owed before the next text
+        self._started = False  # any text emitted yet
+
+    def take(self) -> List[Op]:
+        ops, self.ops = self.ops, []
+        return ops
+
+    def close(self):
+        super().close()
+        for style in STYLES:
+            if style in self._typed_formats:
+                self.ops.append((FORMAT, style))
+        self._typed_formats = frozenset()
+
+    # --- structure ---
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            self._void(tag)
+            return
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        if tag in BLOCK_TAGS:
+            self._block()
+        if tag == "pre":
+            self._pre += 1
+        formats = set(self._formats)
+        if tag in TAG_STYLES:
+            formats.add(TAG_STYLES[tag])
+        style = dict(attrs).get("style")
+        if style:
+            for name, on in _style_changes(style).items():
+                if on:
+                    formats.add(name)
+                else:
+                    formats.discard(name)
+        self._stack.append((tag, self._formats))
+        self._formats = frozenset(formats)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            self._void(tag)
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            return
+        # close everything up to the matching element, browsers forgive missing end tags too
+        for depth in range(len(self._stack) - 1, -1, -1):
+            if self._stack[depth][0] == tag:
+                break
+        else:
+            return
+        while len(self._stack) > depth:
+            open_tag, self._formats = self._stack.pop()
+            if open_tag in SKIP_TAGS:
+                self._skip -= 1
+            if open_tag == "pre":
+                self._pre -= 1
+            if open_tag in BLOCK_TAGS:
+                self._block()
+
+    def _void(self, tag: str):
+        if tag == "br":
+            self._breaks += 1
+            self._space = False
+        elif tag == "hr":
+            self._block()
+
+    def _block(self):
+        if self._started:
+            self._breaks = max(self._breaks, 1)
+        self._space = False
+
+    # --- text ---
+    def handle_data(self, data):
+        if self._skip:
+            return
+        data = data.replace("\r", "")
+        if not self._pre:
+            parts = _SPACE.split(data)
+            for i, part in enumerate(parts):
+                if i and part:
+                    self._space = True  # there was whitespace before this part
+                if part:
+                    self._text(part.replace("\u00a0", " "))
+            if len(parts) > 1 and not parts[-1]:
+                self._space = True
+            return
+        lines = data.split("\n")
+        for i, line in enumerate(lines):
+            if i:
+                self._breaks += 1
+            if line:
+                self._text(line)
+
+    def _append(self, text: str):
+        ops = self.ops
+        if ops and ops[-1][0] == TEXT:
+            ops[-1] = (TEXT, ops[-1][1] + text)
+        else:
+            ops.append((TEXT, text))
+
+    def _text(self, text: str):
+        # owed breaks and spaces keep the formatting of the text before them
+        if self._breaks:
+            if self._started:
+                self._append("\n" * self._breaks)
+        elif self._space and self._started:
+            self._append(" ")
+        self._breaks = 0
+        self._space = False
+        if self._formats != self._typed_formats:
+            for style in STYLES:
+                if (style in self._formats) != (style in self._typed_formats):
+                    self.ops.append((FORMAT, style))
+            self._typed_formats = self._formats
+        self._append(text)
+        self._started = True
+
+
+def compile_html(html: str) -> List[Op]:
+    """All ops for html at once, for small payloads and checks."""
+    compiler = RichTextCompiler()
+    compiler.feed(html)
+    compiler.close()
+    return compiler.take()
+
+
+class FormatCommand(NamedTuple):
+    style: str
+    key: str  # shortcut for keyboard.press
+
+
+def shortcut(style: str) -> str:
+    modifier = "Meta" if sys.platform == "darwin" else "Control"
+    return f"{modifier}+{style[0]}"
+
+
+class RichTextSource:
+    """An HTML payload typed with its formatting, in the shape of ``source.TextSource``.
+
+    ``chunks()`` yields ``(start, end, text)`` where start/end are offsets into the HTML
+    (for progress), and ``(start, start, FormatCommand)`` where formatting changes.
+    """
+    is_stdin = False
+
+    def __init__(self, html: str, slice_size: int = SLICE_SIZE, max_ahead: int = MAX_AHEAD):
+        self.html = html
+        self.slice_size = slice_size
+        self.max_ahead = max_ahead
+        self.total_bytes: Optional[int] = len(html)
+
+    async def _produce(self, queue: asyncio.Queue):
+        compiler = RichTextCompiler()
+        html = self.html
+        # every chunk is planned on its own and ends with typo corrections, so text is only
+        # split where formatting changes (or every MAX_RUN chars), not where the markup does
+        run, run_start = "", 0  # text not handed out yet, and the HTML offset it starts at
+        for start in range(0, len(html) or 1, self.slice_size):
+            end = min(start + self.slice_size, len(html))
+            compiler.feed(html[start:end])
+            if end == len(html):
+                compiler.close()
+            for op, value in compiler.take():
+                if op == FORMAT:
+                    if run:
+                        await queue.put((run_start, start, run))
+                        run = ""
+                    await queue.put((start, start, FormatCommand(value, shortcut(value))))
+                    continue
+                if not run:
+                    run_start = start
+                run += value
+                while len(run) >= MAX_RUN:
+                    await queue.put((run_start, start, run[:MAX_RUN]))
+                    run, run_start = run[MAX_RUN:], start
+            await asyncio.sleep(0)  # one slice per step, keystrokes due in between go first
+        if run:
+            await queue.put((run_start, len(html), run))
+        await queue.put(None)
+
+    async def chunks(self) -> AsyncIterator[tuple]:
+        queue: asyncio.Queue = asyncio.Queue(self.max_ahead)
+        producer = asyncio.create_task(self._produce(queue))
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield item
+            await producer  # surfaces parser errors
+        finally:
+            producer.cancel()
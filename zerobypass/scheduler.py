@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+import asyncio
+import time
+
+
+class DeadlineScheduler:
+    """Sleeps until absolute deadlines instead of for relative durations.
+
+    Each ``wait(delay)`` moves the deadline forward by ``delay`` and sleeps only for what is
+    left of it, so the time spent in keyboard calls (CDP round-trips) and event-loop stalls
+    is taken out of the next sleep instead of adding up over a job.
+
+    After a stall the scheduler catches up by shortening sleeps, but never below
+    ``min_sleep_ratio`` of the requested delay (no bursts of instant keystrokes), and it
+    never carries more than ``max_catchup`` seconds of debt; anything beyond that is
+    written off and counted in ``lost``.
+    """
+
+    def __init__(self, max_catchup: float = 1.0, min_sleep_ratio: float = 0.25, compensate: bool = True,
+                 clock=time.monotonic, sleep=asyncio.sleep):
+        self.max_catchup = max_catchup
+        self.min_sleep_ratio = min_sleep_ratio
+        self.compensate = compensate
+        self.clock = clock
+        self.sleep = sleep
+        self.planned = 0.0  # sum of every requested delay
+        self.lost = 0.0  # debt written off because it exceeded max_catchup
+        self.drift = 0.0  # how far past its deadline the last wait was called (negative = early)
+        self.total_drift = 0.0  # sum of drift over every wait, the lateness compensation had to absorb
+        self.last_sleep = 0.0  # what the last wait actually asked the event loop to sleep
+        self._deadline = None
+
+    def reset(self):
+        """Re-anchors on the next wait, e.g. after a pause. Totals are kept."""
+        self._deadline = None
+
+    async def wait(self, delay: float):
+        now = self.clock()
+        self.planned += delay
+        # lateness against the previous deadline, before it moves on
+        if self._deadline is None:
+            self.drift = 0.0
+            self._deadline = now
+        else:
+            self.drift = now - self._deadline
+            self.total_drift += self.drift
+        if not self.compensate:
+            # nothing is made up, the deadline is just when this sleep should end
+            self._deadline = now + delay
+            self.last_sleep = delay
+            await self.sleep(delay)
+            return
+
+        self._deadline += delay
+        remaining = self._deadline - now
+
+        if remaining < -self.max_catchup:
+            self.lost += -remaining - self.max_catchup
+            self._deadline = now - self.max_catchup
+            remaining = -self.max_catchup
+
+        self.last_sleep = max(remaining, delay * self.min_sleep_ratio)
+        await self.sleep(self.last_sleep)
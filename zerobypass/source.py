@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Text sources that are read incrementally instead of loaded up front.
+
+A ``TextSource`` decodes a file (memory-mapped) or stdin in blocks with an incremental
+UTF-8 decoder and hands the engine one chunk at a time, so typing starts after the first
+block and memory stays bounded by the chunk size, not the document size.
+"""
+import asyncio
+import codecs
+import mmap
+import os
+import stat
+import sys
+from typing import AsyncIterator, Optional, Tuple
+
+BLOCK_SIZE = 64 * 1024
+
+
+class TextSource:
+    """UTF-8 text from ``path``, or from stdin when path is ``-``.
+
+    ``chunks()`` yields ``(start_byte, end_byte, text)`` with carriage returns removed.
+    ``total_bytes`` is None when the size isn't known up front (pipes).
+    """
+
+    def __init__(self, path: str, block_size: int = BLOCK_SIZE):
+        self.path = path
+        self.block_size = block_size
+        self.total_bytes: Optional[int] = None
+        if path != "-":
+            self.total_bytes = os.path.getsize(path)
+        else:
+            info = os.fstat(sys.stdin.fileno())
+            if stat.S_ISREG(info.st_mode):  # stdin redirected from a file
+                self.total_bytes = info.st_size
+
+    @property
+    def is_stdin(self) -> bool:
+        return self.path == "-"
+
+    async def chunks(self) -> AsyncIterator[Tuple[int, int, str]]:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        position = 0
+        async for block in (self._stdin_blocks() if self.is_stdin else self._file_blocks()):
+            text = decoder.decode(block).replace("\r", "")
+            start, position = position, position + len(block)
+            if text:
+                yield start, position, text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield position, position, tail
+
+    async def _file_blocks(self):
+        with open(self.path, "rb") as f:
+            if not self.total_bytes:
+                return  # mmap can't map an empty file
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, "madvise"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                for offset in range(0, len(mm), self.block_size):
+                    yield mm[offset:offset + self.block_size]
+
+    async def _stdin_blocks(self):
+        stdin = sys.stdin.buffer
+        read = getattr(stdin, "read1", stdin.read)
+        while True:
+            # pipes block until the writer sends something, keep that off the event loop
+            block = await asyncio.to_thread(read, self.block_size)
+            if not block:
+                return
+            yield block
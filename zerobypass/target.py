@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Reading back what is in the element we type into."""
+from typing import Iterable, List, Optional
+
+from playwright.async_api import Error
+
+# Shared by the scripts below. target() is the focused element, following focus into
+# same-origin iframes. walk() visits the text of a contenteditable piece by piece: text
+# nodes, "\n" for a <br> and one "\n" before a block that follows content (visit gets
+# node null for those). Reading and selecting walk the same way, so they share
+# coordinates; innerText can't be used, it puts two newlines between paragraphs and has
+# no way back to DOM positions. Offsets are UTF-16 code units, like every DOM offset.
+_TARGET_JS = """
+    const target = () => {
+        let el = document.activeElement;
+        while (el && el.tagName === "IFRAME") {
+            try {
+                el = el.contentDocument.activeElement;
+            } catch (e) {
+                return null;
+            }
+        }
+        return el;
+    };
+    const BLOCKS = new Set(["ADDRESS", "ARTICLE", "ASIDE", "BLOCKQUOTE", "DD", "DIV", "DL", "DT", "FIGURE",
+                            "FOOTER", "H1", "H2", "H3", "H4", "H5", "H6", "HEADER", "HR", "LI", "OL", "P",
+                            "PRE", "SECTION", "TABLE", "TR", "UL"]);
+    const walk = (root, visit) => {
+        const skip = {acceptNode: (node) => node.nodeName === "SCRIPT" || node.nodeName === "STYLE"
+                                            ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT};
+        const walker = root.ownerDocument.createTreeWalker(root, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT, skip);
+        let started = false, afterBreak = false, pending = false;
+        for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+            let text;
+            if (node.nodeType === Node.TEXT_NODE) {
+                text = node.data;
+                if (!text) continue;
+            } else if (node.nodeName === "BR") {
+                text = "\\n";
+            } else {
+                // a block right after a line break doesn't start another line
+                if (BLOCKS.has(node.nodeName) && started && !afterBreak) pending = true;
+                continue;
+            }
+            if (pending && visit("\\n", null)) return;
+            pending = false;
+            if (visit(text, node)) return;  // visit returns true to stop
+            started = true;
+            afterBreak = text.endsWith("\\n");
+        }
+    };
+"""
+
+# Returns the value of the focused input/textarea or the walked text of a focused
+# contenteditable. null when there is nothing we can read (e.g. canvas based editors).
+READ_TARGET_JS = """
+() => {""" + _TARGET_JS + """
+    const el = target();
+    if (!el) return null;
+    if (el.tagName === "TEXTAREA" || el.tagName === "INPUT") return el.value;
+    if (!el.isContentEditable) return null;
+    const parts = [];
+    walk(el, (text) => {
+        parts.push(text);
+    });
+    return parts.join("");
+}
+"""
+
+# Selects [start, end) of the focused element, in UTF-16 offsets into what READ_TARGET_JS
+# returns. In a contenteditable both ends are found in one walk and selected as a Range.
+# Returns false when the element isn't editable text.
+SELECT_RANGE_JS = """
+([start, end]) => {""" + _TARGET_JS + """
+    const el = target();
+    if (!el) return false;
+    if (el.tagName === "TEXTAREA" || el.tagName === "INPUT") {
+        el.setSelectionRange(start, end);
+        return true;
+    }
+    if (!el.isContentEditable) return false;
+    const wanted = [start, end], points = [];
+    let pos = 0;
+    walk(el, (text, node) => {
+        // an offset on a block break resolves to the start of the next piece
+        while (node && points.length < 2 && wanted[points.length] <= pos + text.length) {
+            const at = wanted[points.length] - pos;
+            if (node.nodeType === Node.TEXT_NODE) {
+                points.push([node, at]);
+            } else {
+                const index = Array.prototype.indexOf.call(node.parentNode.childNodes, node);
+                points.push([node.parentNode, index + at]);
+            }
+        }
+        pos += text.length;
+        return points.length === 2;
+    });
+    while (points.length < 2) points.push([el, el.childNodes.length]);
+    const range = el.ownerDocument.createRange();
+    range.setStart(...points[0]);
+    range.setEnd(...points[1]);
+    const selection = el.ownerDocument.defaultView.getSelection();
+    selection.removeAllRanges();
+    selection.addRange(range);
+    return true;
+}
+"""
+
+
+async def read_target_text(page) -> Optional[str]:
+    """The focused element's text in one page.evaluate call, or None if it can't be read."""
+    try:
+        text = await page.evaluate(READ_TARGET_JS)
+    except Error:
+        return None
+    if text is None:
+        return None
+    # contenteditables keep runs of spaces as non-breaking spaces, and text may use CRLF
+    return text.replace("\r\n", "\n").replace("\u00a0", " ")
+
+
+def common_prefix_length(a: str, b: str) -> int:
+    """Length of the longest common prefix, comparing slices instead of single characters."""
+    low, high = 0, min(len(a), len(b))
+    # a[:low] == b[:low] always holds
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[low:mid] == b[low:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def common_suffix_length(a: str, b: str) -> int:
+    """Length of the longest common suffix, the mirror of common_prefix_length."""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[len(a) - mid:len(a) - low] == b[len(b) - mid:len(b) - low]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def utf16_offsets(text: str, offsets: Iterable[int]) -> List[int]:
+    """Ascending indexes into text converted to UTF-16 code units, which the DOM counts in.
+
+    Chars outside the BMP (emoji) are one index in Python and two in the DOM.
+    """
+    result = []
+    done = shift = 0
+    for offset in offsets:
+        segment = text[done:offset]
+        shift += len(segment.encode("utf-16-le", "surrogatepass")) // 2 - len(segment)
+        done = offset
+        result.append(offset + shift)
+    return result
+
+
+async def select_range(page, start: int, end: int) -> bool:
+    """Selects [start, end) in the focused element, in UTF-16 offsets (see utf16_offsets)."""
+    try:
+        return bool(await page.evaluate(SELECT_RANGE_JS, [start, end]))
+    except Error:
+        return False
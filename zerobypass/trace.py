@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Hot-path timing traces.
+
+A ``Tracer`` attached to an Algorithm records keyboard call latency (``keyboard``), sleeps
+and how much they overshot (``sleep``, ``sleep_overshoot``), typo corrections
+(``correction``) and time spent paused (``pause``). Timings are aggregated into histograms
+and can be written as a JSON summary plus a Chrome trace-event file (chrome://tracing or
+https://ui.perfetto.dev).
+"""
+import json
+import math
+import pathlib
+import time
+from array import array
+from typing import Callable, Dict, List, Optional
+
+
+class Histogram:
+    """Power-of-two microsecond buckets."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        bucket = int(max(seconds, 0) * 1e6).bit_length()  # 0 -> <1us, n -> [2^(n-1), 2^n) us
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile, in seconds."""
+        target = p / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return (1 << bucket) / 1e6
+        return self.max
+
+    def summary(self) -> dict:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_s": self.total / self.count,
+            "min_s": self.min,
+            "max_s": self.max,
+            "p50_s": self.percentile(50),
+            "p90_s": self.percentile(90),
+            "p99_s": self.percentile(99),
+            "buckets_us": {f"<{1 << b}": n for b, n in sorted(self.buckets.items())},
+        }
+
+
+class Tracer:
+    """Collects timings from the typing engine.
+
+    Every event goes into a histogram. The first ``max_events`` spans are also kept
+    individually for the Chrome trace. ``listener`` is called as
+    ``listener(name, start, duration)`` for every span, for custom exporters.
+    """
+
+    def __init__(self, max_events: int = 500_000, listener: Optional[Callable[[str, float, float], None]] = None):
+        self.origin = time.perf_counter()
+        self.max_events = max_events
+        self.listener = listener
+        self.histograms: Dict[str, Histogram] = {}
+        self._names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self._ids = array('H')
+        self._starts = array('d')
+        self._durations = array('d')
+        self.dropped = 0
+
+    @staticmethod
+    def now() -> float:
+        return time.perf_counter()
+
+    def observe(self, name: str, value: float):
+        """Adds a value to a histogram without a span in the trace."""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.add(value)
+
+    def span(self, name: str, start: float, end: Optional[float] = None):
+        """Records an event that started at ``start`` (a ``Tracer.now()`` value)."""
+        duration = (end if end is not None else time.perf_counter()) - start
+        self.observe(name, duration)
+        if len(self._ids) < self.max_events:
+            name_id = self._name_ids.get(name)
+            if name_id is None:
+                name_id = self._name_ids[name] = len(self._names)
+                self._names.append(name)
+            self._ids.append(name_id)
+            self._starts.append(start - self.origin)
+            self._durations.append(duration)
+        else:
+            self.dropped += 1
+        if self.listener is not None:
+            self.listener(name, start, duration)
+
+    def summary(self) -> dict:
+        return {
+            "wall_s": time.perf_counter() - self.origin,
+            "events": len(self._ids),
+            "dropped_events": self.dropped,
+            "histograms": {name: h.summary() for name, h in sorted(self.histograms.items())},
+        }
+
+    def chrome_trace(self) -> dict:
+        events = [{"name": self._names[i], "ph": "X", "ts": start * 1e6, "dur": duration * 1e6, "pid": 1, "tid": 1}
+                  for i, start, duration in zip(self._ids, self._starts, self._durations)]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, directory: str, prefix: Optional[str] = None) -> pathlib.Path:
+        """Writes ``<prefix>.summary.json`` and ``<prefix>.trace.json`` into directory."""
+        out = pathlib.Path(directory)
+        out.mkdir(parents=True, exist_ok=True)
+        prefix = prefix or time.strftime("zerobypass-%Y%m%d-%H%M%S")
+        (out / f"{prefix}.summary.json").write_text(json.dumps(self.summary(), indent=2))
+        (out / f"{prefix}.trace.json").write_text(json.dumps(self.chrome_trace()))
+        return out / f"{prefix}.summary.json"
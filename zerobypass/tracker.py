@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Keeps track of which tab and element the user is in, from browser events.
+
+The context's ``page`` and ``close`` events maintain the set of open tabs, and an init
+script in every frame reports focus changes through an exposed binding. Looking up the
+active page is then a dict access instead of a scan plus ``bring_to_front``, and typing
+can start as soon as the user clicks into an editable element.
+"""
+import asyncio
+from typing import Dict, Optional
+
+from playwright.async_api import Error
+
+BINDING = "__zerobypassFocus"
+
+# Reports focus and clicks inside editable elements, and the tab becoming visible/focused.
+# Iframes report for themselves (the script runs in every frame), so the parent ignores
+# focus landing on an IFRAME element.
+FOCUS_SCRIPT = """
+(() => {
+    if (window.__zerobypassTracking) return;
+    window.__zerobypassTracking = true;
+    const NOT_TEXT = ["button", "checkbox", "radio", "submit", "reset", "file", "image", "range", "color", "hidden"];
+    const report = (kind) => {
+        const el = document.activeElement;
+        if (el && el.tagName === "IFRAME") return;
+        const editable = !!el && (el.isContentEditable || el.tagName === "TEXTAREA" ||
+            (el.tagName === "INPUT" && !NOT_TEXT.includes(el.type)));
+        const binding = window.__zerobypassFocus;
+        if (binding) binding({kind, editable, tag: el ? el.tagName : null}).catch(() => {});
+    };
+    window.addEventListener("focusin", () => report("focus"), true);
+    window.addEventListener("click", () => report("click"), true);
+    window.addEventListener("focus", () => report("window"));
+    document.addEventListener("visibilitychange", () => {
+        if (document.visibilityState === "visible") report("window");
+    });
+})();
+"""
+
+
+class PageTracker:
+    def __init__(self):
+        self.page = None  # the tab the user was last active in
+        self.frame = None  # frame of the focused element
+        self.focused: Optional[dict] = None  # {"kind", "editable", "tag"} of the last report
+        self._pages: Dict[object, None] = {}  # open tabs in opening order
+        self._activated = asyncio.Event()
+
+    async def attach(self, context):
+        context.on("page", self._add_page)
+        await context.expose_binding(BINDING, self._on_focus)
+        await context.add_init_script(FOCUS_SCRIPT)
+        for page in context.pages:
+            self._add_page(page)
+            # init scripts only run on the next navigation, inject into what's already loaded
+            for frame in page.frames:
+                try:
+                    await frame.evaluate(FOCUS_SCRIPT)
+                except Error:
+                    pass
+
+    def _add_page(self, page):
+        self._pages[page] = None
+        page.on("close", self._remove_page)
+        self.page = page  # new tabs open in the foreground
+
+    def _remove_page(self, page):
+        self._pages.pop(page, None)
+        if page is self.page:
+            self.page = next(reversed(self._pages), None)
+            self.frame = self.focused = None
+
+    def _on_focus(self, source, info: dict):
+        page = source["page"]
+        if page not in self._pages:
+            return
+        self.page = page
+        if info.get("kind") == "window":
+            return
+        self.frame = source["frame"]
+        self.focused = info
+        if info.get("editable"):
+            self._activated.set()
+
+    @property
+    def editable_focused(self) -> bool:
+        return bool(self.focused and self.focused.get("editable"))
+
+    async def wait_for_editable(self):
+        """Waits for the next focus or click on an editable element, in any tab."""
+        self._activated.clear()
+        await self._activated.wait()
+        return self.page